@@ -0,0 +1,32 @@
+import os
+import shutil
+
+
+# Metrics from every worker are aggregated through PROMETHEUS_MULTIPROC_DIR
+# (see processes/metrics.py). Export it before starting gunicorn, e.g.
+#   PROMETHEUS_MULTIPROC_DIR=/tmp/textile-metrics gunicorn textile_assistant.wsgi
+
+
+def on_starting(server):
+    # Samples left over from a previous run would be added to the new totals
+    metrics_dir = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if metrics_dir:
+        shutil.rmtree(metrics_dir, ignore_errors=True)
+        os.makedirs(metrics_dir, exist_ok=True)
+
+
+def child_exit(server, worker):
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
+
+
+def post_worker_init(worker):
+    # Build the analyzer's datasets and distance matrices before the worker
+    # takes traffic, so the first request doesn't pay for it
+    from processes.test import get_analyzer
+    get_analyzer()
+
+    # Seed the similar-process index from saved analyses the same way
+    from processes.views import raw_material_index
+    raw_material_index.ensure_loaded()
@@ -1,4 +1,157 @@
 from django.contrib import admin
-from .models import Supplier
-# Register your models here.
-admin.site.register(Supplier)
+from django.contrib.auth.admin import UserAdmin
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+from .materials import canonical_material
+from .models import CustomUser, SavedAnalysis, ScoringProfile, Supplier
+from .states import state_resolver
+
+
+def estimated_row_count(queryset):
+    """
+    Returns the database's own estimate of a table's row count without scanning
+    it (PostgreSQL and MySQL), or None where no cheap estimate exists.
+    """
+    connection = connections[queryset.db]
+    table = queryset.model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass", [table])
+        elif connection.vendor == "mysql":
+            cursor.execute("SELECT table_rows FROM information_schema.tables "
+                           "WHERE table_schema = DATABASE() AND table_name = %s", [table])
+        else:
+            return None
+        row = cursor.fetchone()
+    # PostgreSQL reports -1 for a table that has never been analyzed
+    return int(row[0]) if row and row[0] is not None and row[0] >= 0 else None
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator for tables too big to COUNT(*) on every page load. The
+    unfiltered changelist uses the database's row estimate; filtered ones
+    count at most MAX_COUNT rows, so pages past that are out of reach until
+    the filter is narrowed.
+    """
+    MAX_COUNT = 10000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.has_filters():
+            estimate = estimated_row_count(queryset)
+            if estimate is not None and estimate > self.MAX_COUNT:
+                return estimate
+        return queryset.order_by()[:self.MAX_COUNT].count()
+
+
+class ExactTextFilter(admin.SimpleListFilter):
+    """
+    Filters a column by a typed exact value instead of listing every distinct
+    value, which on a large table means a full scan for each page load. The
+    equality lookup uses the column's index.
+    """
+    template = "admin/processes/text_filter.html"
+
+    def lookups(self, request, model_admin):
+        return ()
+
+    def has_output(self):
+        return True
+
+    def queryset(self, request, queryset):
+        value = (self.value() or "").strip()
+        if value:
+            return queryset.filter(**{self.parameter_name: value})
+        return queryset
+
+    def choices(self, changelist):
+        yield {
+            "parameter_name": self.parameter_name,
+            "value": self.value(),
+            "query_string": changelist.get_query_string(remove=[self.parameter_name]),
+            "hidden_params": [(name, value) for name, value in changelist.params.items() if name != self.parameter_name],
+        }
+
+
+class MaterialFilter(ExactTextFilter):
+    title = "material"
+    parameter_name = "material"
+
+
+class StateFilter(ExactTextFilter):
+    title = "state"
+    parameter_name = "state"
+
+
+class CityFilter(ExactTextFilter):
+    title = "city"
+    parameter_name = "city"
+
+
+@admin.register(Supplier)
+class SupplierAdmin(admin.ModelAdmin):
+    list_display = ("name", "material", "city", "state", "contact")
+    list_filter = (MaterialFilter, StateFilter, CityFilter)
+    # Exact matches only, so every search is an index lookup (see get_search_results)
+    search_fields = ("material__exact", "city__exact", "state__exact")
+    search_help_text = "Exact material, city or state name, e.g. Tamil Nadu or cotton yarn."
+    ordering = ("-id",)
+    sortable_by = ("material", "city", "state")
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    show_facets = admin.ShowFacets.NEVER
+
+    def get_search_results(self, request, queryset, search_term):
+        """
+        Matches the whole term rather than each word separately, so "Tamil Nadu"
+        finds Tamil Nadu without quotes. The term is tried as typed and in the
+        capitalized and canonical spellings the data is stored under, each an
+        equality lookup on an indexed column.
+        """
+        term = " ".join(search_term.strip().strip("\"'").split())
+        if not term:
+            return queryset, False
+        variants = {term, term.lower(), term.title(), canonical_material(term)}
+        state = state_resolver.canonical(term)
+        if state:
+            variants.add(state)
+        return queryset.filter(Q(material__in=variants) | Q(city__in=variants) | Q(state__in=variants)), False
+
+
+@admin.register(CustomUser)
+class CustomUserAdmin(UserAdmin):
+    add_fieldsets = (
+        (None, {"classes": ("wide",), "fields": ("email", "username", "password1", "password2")}),
+    )
+    list_display = ("email", "username", "is_staff")
+    # Used by the user autocomplete on other admins
+    search_fields = ("email", "username")
+    ordering = ("email",)
+
+
+@admin.register(SavedAnalysis)
+class SavedAnalysisAdmin(admin.ModelAdmin):
+    list_display = ("id", "user", "kind", "dataset_version", "created_at")
+    list_filter = ("kind",)
+    list_select_related = ("user",)
+    autocomplete_fields = ("user",)
+    readonly_fields = ("input_hash", "dataset_version", "created_at")
+    ordering = ("-id",)
+    sortable_by = ()
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    show_facets = admin.ShowFacets.NEVER
+
+
+@admin.register(ScoringProfile)
+class ScoringProfileAdmin(admin.ModelAdmin):
+    list_display = ("name", "user", "weight_vector", "proximity_weight", "updated_at")
+    list_select_related = ("user",)
+    autocomplete_fields = ("user",)
+    readonly_fields = ("weight_vector", "created_at", "updated_at")
+    ordering = ("-id",)
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class ProcessesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'processes'
+
+    def ready(self):
+        # Connects the signal handlers that evict cached JWT verifications
+        from . import authentication  # noqa: F401
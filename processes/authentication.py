@@ -0,0 +1,116 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.signals import user_logged_out
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from .metrics import record_cache
+
+
+class VerifiedTokenCache:
+    """
+    Bounded LRU of raw access token -> (user snapshot, validated token).
+
+    Entries expire at the token's own ``exp`` or after ``ttl`` seconds,
+    whichever comes first. Saving, deleting or logging out a user evicts their
+    tokens in this process; the TTL bounds how long other worker processes can
+    keep serving a stale snapshot (e.g. after the user is deactivated).
+    """
+
+    def __init__(self, max_size, ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.tokens_by_user = {}
+        self.lock = threading.Lock()
+
+    def get(self, raw_token):
+        with self.lock:
+            entry = self.entries.get(raw_token)
+            if entry is None:
+                return None
+            user, validated_token, expires_at = entry
+            if time.time() >= expires_at:
+                self._remove(raw_token)
+                return None
+            self.entries.move_to_end(raw_token)
+        # Callers get their own copy so per-request changes don't leak between requests
+        return copy.copy(user), validated_token
+
+    def put(self, raw_token, user, validated_token):
+        if self.max_size <= 0:
+            return
+        expires_at = min(validated_token.get("exp", 0), time.time() + self.ttl)
+        with self.lock:
+            if raw_token in self.entries:
+                self._remove(raw_token)
+            self.entries[raw_token] = (copy.copy(user), validated_token, expires_at)
+            self.tokens_by_user.setdefault(user.pk, set()).add(raw_token)
+            while len(self.entries) > self.max_size:
+                self._remove(next(iter(self.entries)))
+
+    def evict_user(self, user_id):
+        with self.lock:
+            for raw_token in self.tokens_by_user.pop(user_id, ()):
+                self.entries.pop(raw_token, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.tokens_by_user.clear()
+
+    def _remove(self, raw_token):
+        user = self.entries.pop(raw_token)[0]
+        tokens = self.tokens_by_user.get(user.pk)
+        if tokens is not None:
+            tokens.discard(raw_token)
+            if not tokens:
+                del self.tokens_by_user[user.pk]
+
+
+token_cache = VerifiedTokenCache(settings.JWT_VERIFY_CACHE_SIZE, settings.JWT_VERIFY_CACHE_TTL)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that remembers verified access tokens, so repeat requests
+    with the same token skip signature verification and the user query.
+    """
+
+    def authenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        cached = token_cache.get(raw_token)
+        record_cache("jwt", cached is not None)
+        if cached is not None:
+            return cached
+
+        validated_token = self.get_validated_token(raw_token)
+        user = self.get_user(validated_token)
+        token_cache.put(raw_token, user, validated_token)
+        return user, validated_token
+
+
+@receiver(post_save, sender=get_user_model())
+@receiver(post_delete, sender=get_user_model())
+def evict_saved_user(sender, instance, **kwargs):
+    # Covers deactivation and password changes as well as deletion
+    token_cache.evict_user(instance.pk)
+
+
+@receiver(user_logged_out)
+def evict_logged_out_user(sender, request, user, **kwargs):
+    if user is not None:
+        token_cache.evict_user(user.pk)
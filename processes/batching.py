@@ -0,0 +1,116 @@
+import threading
+import time
+from concurrent.futures import Future, TimeoutError
+from contextlib import contextmanager
+
+from .metrics import observe_stage
+
+
+class MicroBatcher:
+    """
+    Merges lookups made by concurrent requests into one upstream call.
+
+    A fetch() made while other requests are active opens (or joins) a batch
+    that is flushed after ``window`` seconds or once it holds ``max_size`` keys.
+    The flush calls ``handler(keys)``, which yields ``(key, value)`` pairs as
+    they become available, and each waiting request gets its value as soon as
+    its pair arrives. When nothing else is in flight fetch() returns None
+    straight away, so a lone request doesn't pay for the window.
+
+    Args:
+        handler (callable): Takes a list of keys and yields (key, value) pairs
+        window (float): Seconds to wait for more keys after the first one
+        max_size (int): Keys that flush a batch early
+        name (str): Label for the batch_wait stage metric
+    """
+
+    def __init__(self, handler, window, max_size, name="batch"):
+        self.handler = handler
+        self.window = window
+        self.max_size = max_size
+        self.name = name
+        self.lock = threading.Lock()
+        self.pending = None  # key -> Future for the batch being collected
+        self.timer = None
+        self.active_count = 0
+
+    @contextmanager
+    def active(self):
+        """Marks a request as in flight, so concurrent fetches know batching will pay off"""
+        with self.lock:
+            self.active_count += 1
+        try:
+            yield
+        finally:
+            with self.lock:
+                self.active_count -= 1
+
+    def fetch(self, key, timeout=60):
+        """
+        Returns the batched value for key, or None if the caller should make
+        its own call (batching disabled, no concurrent requests, the key was
+        missing from the response or the batch call failed).
+        """
+        if self.window <= 0:
+            return None
+
+        flush_now = None
+        with self.lock:
+            if self.pending is None and self.active_count <= 1:
+                return None
+            if self.pending is None:
+                self.pending = {}
+                self.timer = threading.Timer(self.window, self.flush_pending, args=(self.pending,))
+                self.timer.daemon = True
+                self.timer.start()
+            future = self.pending.get(key)
+            if future is None:
+                future = self.pending[key] = Future()
+            if len(self.pending) >= self.max_size:
+                flush_now = self.take_pending()
+
+        started = time.perf_counter()
+        if flush_now is not None:
+            self.flush(flush_now)
+        try:
+            return future.result(timeout=timeout)
+        except TimeoutError:
+            return None
+        finally:
+            observe_stage(self.name, "batch_wait", time.perf_counter() - started)
+
+    def take_pending(self):
+        """Detaches the batch being collected; call with the lock held."""
+        batch, self.pending = self.pending, None
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        return batch
+
+    def flush_pending(self, batch):
+        """Flushes batch when its window ends, unless it was already flushed for being full."""
+        with self.lock:
+            # A timer that fired while a full batch was being taken must not
+            # flush the next batch before its own window is up
+            if self.pending is not batch:
+                return
+            self.take_pending()
+        self.flush(batch)
+
+    def flush(self, batch):
+        if len(batch) == 1:
+            # Nobody joined; the caller's own call is as cheap and can stream
+            next(iter(batch.values())).set_result(None)
+            return
+        try:
+            for key, value in self.handler(list(batch)):
+                future = batch.get(key)
+                if future is not None and not future.done():
+                    future.set_result(value)
+        except Exception as e:
+            print(f"Error in {self.name} batch of {len(batch)}: {e}")
+        finally:
+            # Anything the handler didn't answer falls back to an individual call
+            for future in batch.values():
+                if not future.done():
+                    future.set_result(None)
@@ -0,0 +1,157 @@
+import math
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from contextlib import contextmanager
+
+from .metrics import attach_stages, current_stages, observe_stage, record_rejected, set_queue_length
+
+
+class Saturated(Exception):
+    """Raised when an executor's queue is full; retry_after is a hint in seconds."""
+
+    def __init__(self, name, retry_after):
+        super().__init__(f"{name} executor is saturated, retry in {retry_after}s")
+        self.retry_after = retry_after
+
+
+class Lane:
+    """One request's queue within a FairExecutor; get one from FairExecutor.lane()."""
+
+    def __init__(self, executor, view):
+        self.executor = executor
+        self.view = view
+        self.tasks = deque()  # (future, func, args, submitted at, submitter's stage log)
+        self.closed = False
+
+    def submit(self, func, *args):
+        """
+        Queues func(*args) and returns a Future for its result.
+
+        Raises:
+            Saturated: If the executor's queue is full.
+        """
+        return self.executor.submit(self, func, args)
+
+
+class FairExecutor:
+    """
+    A process-wide, bounded thread pool for outbound I/O shared by all requests.
+
+    Each request submits through its own lane, and workers take one task from
+    each lane with queued work in turn, so a request with many lookups can't
+    starve the ones behind it. At most ``max_queue`` tasks wait at a time;
+    beyond that lane() and submit() raise Saturated so the request can be shed
+    with a 503 instead of queueing without bound. Worker threads are started
+    on demand, up to ``max_workers``.
+
+    Args:
+        max_workers (int): Threads running tasks
+        max_queue (int): Tasks allowed to wait for a thread
+        name (str): Label for the queue length and rejection metrics
+    """
+
+    def __init__(self, max_workers, max_queue, name="io"):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.name = name
+        self.lock = threading.Lock()
+        self.ready = threading.Condition(self.lock)
+        self.lanes = deque()  # lanes with queued tasks, in turn order
+        self.queued = 0
+        self.threads = []
+        self.idle = 0
+        self.task_seconds = 1.0  # moving average, for Retry-After
+
+    @contextmanager
+    def lane(self, view="io"):
+        """
+        Opens a lane for one request; tasks it leaves queued are cancelled on
+        exit and later submissions come back already cancelled.
+
+        Args:
+            view (str): Label for the time tasks spend queued (the pool_queue stage)
+
+        Raises:
+            Saturated: If the queue is already full, before any work is done.
+        """
+        with self.lock:
+            if self.queued >= self.max_queue:
+                raise self.saturated()
+        lane = Lane(self, view)
+        try:
+            yield lane
+        finally:
+            self.cancel(lane)
+
+    def submit(self, lane, func, args):
+        future = Future()
+        with self.lock:
+            if lane.closed:
+                # The request has finished or given up; don't start work for it
+                future.cancel()
+                return future
+            if self.queued >= self.max_queue:
+                raise self.saturated()
+            # A profiled request keeps the stage timings of the work it hands off
+            lane.tasks.append((future, func, args, time.perf_counter(), current_stages()))
+            if len(lane.tasks) == 1:
+                self.lanes.append(lane)
+            self.queued += 1
+            set_queue_length(self.name, self.queued)
+            if self.idle == 0 and len(self.threads) < self.max_workers:
+                thread = threading.Thread(target=self.work, name=f"{self.name}-{len(self.threads)}", daemon=True)
+                self.threads.append(thread)
+                thread.start()
+            self.ready.notify()
+        return future
+
+    def cancel(self, lane):
+        with self.lock:
+            lane.closed = True
+            tasks = list(lane.tasks)
+            lane.tasks.clear()
+            if tasks:
+                self.lanes.remove(lane)
+                self.queued -= len(tasks)
+                set_queue_length(self.name, self.queued)
+        # Outside the lock: cancelling runs done callbacks, which may submit
+        for future, *_ in tasks:
+            future.cancel()
+
+    def saturated(self):
+        """Builds the Saturated error, estimating when the queue will have drained; call with the lock held."""
+        record_rejected(self.name)
+        retry_after = max(1, math.ceil(self.queued / self.max_workers * self.task_seconds))
+        return Saturated(self.name, retry_after)
+
+    def work(self):
+        while True:
+            with self.lock:
+                self.idle += 1
+                while not self.lanes:
+                    self.ready.wait()
+                self.idle -= 1
+                # Take the next lane's oldest task and send the lane to the back
+                lane = self.lanes.popleft()
+                future, func, args, submitted, stages = lane.tasks.popleft()
+                if lane.tasks:
+                    self.lanes.append(lane)
+                self.queued -= 1
+                set_queue_length(self.name, self.queued)
+
+            started = time.perf_counter()
+            with attach_stages(stages):
+                observe_stage(lane.view, "pool_queue", started - submitted)
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    result = func(*args)
+                except BaseException as e:
+                    future.set_exception(e)
+                else:
+                    future.set_result(result)
+
+            with self.lock:
+                self.task_seconds += (time.perf_counter() - started - self.task_seconds) * 0.1
@@ -0,0 +1,103 @@
+import json
+
+
+class JSONStreamParser:
+    """
+    Incrementally parses one top-level JSON array or object fed in text chunks,
+    e.g. a streamed Gemini response.
+
+    feed() returns the items completed by each chunk: array elements as values,
+    object fields as (key, value) pairs. Anything before the opening bracket
+    (a ```json fence or a sentence of preamble) and after the closing one is
+    ignored.
+
+    Example:
+        parser = JSONStreamParser()
+        parser.feed('["Cotton", "Pol')   # -> ["Cotton"]
+        parser.feed('yester"]')          # -> ["Polyester"]
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.pos = 0            # next character of buffer to scan
+        self.item_start = None  # start of the current top-level item in buffer
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+        self.container = None   # "array" or "object" once the opening bracket is seen
+        self.done = False
+
+    def feed(self, chunk):
+        """
+        Adds a chunk of text and returns the items it completed.
+
+        Raises:
+            ValueError: If a completed item isn't valid JSON.
+        """
+        if self.done:
+            return []
+        self.buffer += chunk
+        items = []
+
+        while self.pos < len(self.buffer):
+            char = self.buffer[self.pos]
+
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == "\\":
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+
+            elif self.container is None:
+                if char in "[{":
+                    self.container = "array" if char == "[" else "object"
+                    self.depth = 1
+                    self.item_start = self.pos + 1
+
+            elif char == '"':
+                self.in_string = True
+            elif char in "[{":
+                self.depth += 1
+            elif char in "]}":
+                self.depth -= 1
+                if self.depth == 0:
+                    self.add_item(items, self.pos)
+                    self.done = True
+                    break
+            elif char == "," and self.depth == 1:
+                self.add_item(items, self.pos)
+                self.item_start = self.pos + 1
+
+            self.pos += 1
+
+        # Drop text that has been fully consumed so the buffer stays small
+        keep_from = self.pos if self.item_start is None else min(self.item_start, self.pos)
+        if keep_from:
+            self.buffer = self.buffer[keep_from:]
+            self.pos -= keep_from
+            if self.item_start is not None:
+                self.item_start -= keep_from
+        return items
+
+    def add_item(self, items, end):
+        text = self.buffer[self.item_start:end].strip()
+        if not text:  # empty container or trailing comma
+            return
+        try:
+            if self.container == "array":
+                items.append(json.loads(text))
+            else:
+                items.extend(json.loads("{" + text + "}").items())
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON item in stream: {text[:80]!r}") from e
+
+
+def iter_json_items(chunks):
+    """Yields array elements or (key, value) object fields from an iterable of text chunks as they complete."""
+    parser = JSONStreamParser()
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+        if parser.done:
+            return
@@ -0,0 +1,212 @@
+import csv
+import itertools
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+
+from processes.ratelimit import RateLimiter
+from processes.states import state_resolver
+from processes.test import analysis_details, get_analyzer, get_cached_details
+
+
+CSV_FIELDS = ["industry", "investment", "state", "rank", "recommended_state", "overall_score",
+              "electricity_tariff", "fixed_charges", "eodb_score", "labor_score", "infrastructure_score",
+              "recommended_zones", "details", "error"]
+
+
+def read_queries(path):
+    """Yields one query dict per line of a JSONL file, streaming; "-" reads stdin."""
+    f = sys.stdin if path == "-" else open(path, encoding="utf-8")
+    try:
+        for line_number, line in enumerate(f, 1):
+            if line.strip():
+                try:
+                    query = json.loads(line)
+                except ValueError:
+                    yield {"_error": f"line {line_number}: invalid JSON"}
+                    continue
+                if isinstance(query, dict):
+                    yield query
+                else:
+                    yield {"_error": f"line {line_number}: expected a JSON object"}
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+def init_worker():
+    """Sets up Django and builds the analyzer once per worker process."""
+    django.setup()
+    get_analyzer()
+
+
+@lru_cache(maxsize=4096)
+def rank(industry, investment, state):
+    analyzer = get_analyzer()
+    return analysis_details(analyzer, industry, investment, state), analyzer.analyze_location(industry, investment, state, raw=True)
+
+
+def text_field(query, name):
+    """Returns a query field as stripped text ("" when missing)."""
+    value = query.get(name)
+    if value is None:
+        return ""
+    if not isinstance(value, str):
+        raise ValueError(f"'{name}' must be a string")
+    return value.strip()
+
+
+def analyze_query(query):
+    """
+    Ranks the states for one query; runs in a worker process. Repeated queries
+    are answered from the worker's cache. Never raises, so one bad line can't
+    stop the batch.
+
+    Returns:
+        dict: The normalized query with "analysis_details" and "rankings", or "error".
+    """
+    if "_error" in query:
+        return {"query": query, "error": query["_error"]}
+    try:
+        industry = text_field(query, "industry").lower()
+        investment = text_field(query, "investment").lower()
+        state = text_field(query, "state") or None
+    except ValueError as e:
+        return {"query": query, "error": str(e)}
+    # One spelling per state, so "TN" and "Tamil Nadu" share a cache entry
+    state = state_resolver.canonical(state) or state
+    normalized = {"industry": industry, "investment": investment, "state": state}
+
+    try:
+        analyzer = get_analyzer()
+        if industry not in analyzer.electricity_intensity:
+            return {"query": normalized, "error": f"Invalid industry type. Valid options are: {', '.join(analyzer.electricity_intensity)}."}
+        if investment not in analyzer.investment_scales:
+            return {"query": normalized, "error": f"Invalid investment scale. Valid options are: {', '.join(analyzer.investment_scales)}."}
+
+        details, rankings = rank(industry, investment, state)
+    except Exception as e:
+        return {"query": normalized, "error": f"Analysis failed: {e}"}
+    return {"query": normalized, "analysis_details": details, "rankings": rankings}
+
+
+class JSONLWriter:
+    def __init__(self, f):
+        self.f = f
+
+    def write(self, result):
+        self.f.write(json.dumps(result, ensure_ascii=False) + "\n")
+
+
+class CSVWriter:
+    """One row per ranked state; the Gemini details go on each query's first row."""
+
+    def __init__(self, f):
+        self.writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
+        self.writer.writeheader()
+
+    def write(self, result):
+        query = {key: result["query"].get(key) for key in ("industry", "investment", "state")}
+        if "error" in result:
+            self.writer.writerow({**query, "error": result["error"]})
+            return
+        details = json.dumps(result["results"], ensure_ascii=False) if "results" in result else ""
+        for position, row in enumerate(result["rankings"], 1):
+            self.writer.writerow({
+                **query,
+                "rank": position,
+                "recommended_state": row["state"],
+                "overall_score": row["overall_score"],
+                "electricity_tariff": row["electricity_tariff"],
+                "fixed_charges": row["fixed_charges"],
+                "eodb_score": row["eodb_score"],
+                "labor_score": row["labor_score"],
+                "infrastructure_score": row["infrastructure_score"],
+                "recommended_zones": "; ".join(row["recommended_zones"]),
+                "details": details if position == 1 else "",
+            })
+
+
+class Command(BaseCommand):
+    help = (
+        "Runs the location analyzer over a JSONL file of {\"industry\", \"investment\", "
+        "\"state\"} queries in a process pool and streams the rankings to a JSONL or "
+        "CSV file, optionally adding the Gemini assessment under a rate limit. The "
+        "input is read in batches, so files larger than memory are fine."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help='Queries file, .jsonl ("-" for stdin)')
+        parser.add_argument("--output", default="-", help="Results file, .jsonl or .csv (default: stdout as JSONL)")
+        parser.add_argument("--batch-size", type=int, default=1000, help="Queries read and ranked at a time")
+        parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Processes running the analyzer")
+        parser.add_argument("--enrich", action="store_true", help="Add the Gemini assessment (cached) to each result")
+        parser.add_argument("--rate", type=float, default=1.0, help="Gemini calls per second with --enrich (0 for no limit)")
+        parser.add_argument("--concurrency", type=int, default=4, help="Gemini calls in flight with --enrich")
+
+    def handle(self, *args, **options):
+        if options["path"] != "-" and not os.path.exists(options["path"]):
+            raise CommandError(f"{options['path']} does not exist")
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be at least 1")
+
+        output = options["output"]
+        out_file = sys.stdout if output == "-" else open(output, "w", newline="", encoding="utf-8")
+        writer = CSVWriter(out_file) if output.endswith(".csv") else JSONLWriter(out_file)
+
+        limiter = RateLimiter(options["rate"], burst=options["concurrency"])
+        totals = {"read": 0, "ok": 0, "failed": 0}
+        started = time.perf_counter()
+
+        try:
+            with ProcessPoolExecutor(max_workers=options["workers"], initializer=init_worker) as executor, \
+                    ThreadPoolExecutor(max_workers=options["concurrency"]) as gemini:
+                queries = read_queries(options["path"])
+                while batch := list(itertools.islice(queries, options["batch_size"])):
+                    totals["read"] += len(batch)
+                    chunksize = max(1, len(batch) // (options["workers"] * 4))
+                    results = executor.map(analyze_query, batch, chunksize=chunksize)
+                    if options["enrich"]:
+                        results = [(result, gemini.submit(self.enrich, result, limiter) if "error" not in result else None)
+                                   for result in results]
+                    else:
+                        results = ((result, None) for result in results)
+
+                    for result, details in results:
+                        if details is not None:
+                            try:
+                                result["results"] = details.result()
+                            except Exception as e:
+                                result["error"] = f"Gemini enrichment failed: {e}"
+                        totals["failed" if "error" in result else "ok"] += 1
+                        writer.write(result)
+                    out_file.flush()
+                    self.report(totals, time.perf_counter() - started)
+        finally:
+            self.stderr.write("")
+            if output != "-":
+                out_file.close()
+
+        elapsed = time.perf_counter() - started
+        self.stderr.write(
+            f"Analyzed {totals['ok']} of {totals['read']} queries ({totals['failed']} failed) "
+            f"in {elapsed:.1f}s, {totals['read'] / elapsed if elapsed else 0:.0f} queries/s"
+        )
+
+    def enrich(self, result, limiter):
+        """Fetches the Gemini assessment for a ranked query, through the shared cache"""
+        query = result["query"]
+        return get_cached_details(query["industry"], query["investment"], query["state"],
+                                  get_analyzer(), result["rankings"], limiter=limiter)
+
+    def report(self, totals, elapsed):
+        rate = totals["read"] / elapsed if elapsed else 0
+        self.stderr.write(f"\r{totals['read']} read, {totals['ok']} ok, {totals['failed']} failed, "
+                          f"{rate:.0f} queries/s", ending="")
+        self.stderr.flush()
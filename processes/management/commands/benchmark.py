@@ -0,0 +1,204 @@
+import json
+import statistics
+import subprocess
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client, override_settings
+from rest_framework.test import APIRequestFactory
+
+from processes import test as analyzer_module
+from processes import views
+from processes.test import ManufacturingLocationAnalyzer
+
+
+BENCHMARK_DIR = Path(settings.BASE_DIR) / "benchmarks"
+
+FAKE_DETAILS = json.dumps({
+    "State/UT": "Gujarat", "Overall Score": 88, "Electricity Tariff": "7.52 INR/unit",
+    "Fixed Charges": "Rs. 0/month", "EODB Score": 99, "Labor Score": 61, "Infrastructure Score": 80,
+    "Recommended Zones": ["Surat", "Ahmedabad"], "Preferred State": None, "Conclusion": "Viable."
+})
+FAKE_MATERIALS = '["Cotton fiber", "Polyester yarn", "Reactive dyes", "Sewing thread"]'
+
+
+class FakeGenerativeModel:
+    """Stands in for genai.GenerativeModel with canned, instant responses."""
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def generate_content(self, prompt, stream=False, **kwargs):
+        text = FAKE_MATERIALS if "RAW MATERIALS" in prompt else FAKE_DETAILS
+        if stream:
+            # Chunked roughly like the streaming API does
+            return [SimpleNamespace(text=text[i:i + 40]) for i in range(0, len(text), 40)]
+        part = SimpleNamespace(text=text)
+        return SimpleNamespace(text=text, candidates=[SimpleNamespace(content=SimpleNamespace(parts=[part]))])
+
+
+def synthetic_districts(analyzer, per_state=20, seed=0):
+    """About 700 districts scattered around the state centroids, half with their own tariffs."""
+    rng = np.random.default_rng(seed)
+    rows = []
+    for state, (lat, lon) in analyzer.state_centroids.items():
+        for i in range(per_state):
+            rows.append({
+                "State/UT": state, "District": f"{state} {i}",
+                "Latitude": lat + rng.normal(0, 0.8), "Longitude": lon + rng.normal(0, 0.8),
+                "Avg_Tariff": rng.uniform(4, 12) if i % 2 else None,
+            })
+    return pd.DataFrame(rows)
+
+
+def fake_maps_get(url, params=None, **kwargs):
+    """Stands in for requests.get against the Places textsearch and geocode APIs."""
+    if "geocode" in url:
+        payload = {"results": [{"address_components": [
+            {"long_name": "Gujarat", "types": ["administrative_area_level_1", "political"]},
+            {"long_name": "India", "types": ["country", "political"]}
+        ], "geometry": {"location": {"lat": 21.17, "lng": 72.83}}}]}
+    else:
+        payload = {"results": [{"name": f"Supplier {i}", "rating": 4.0 + i / 10} for i in range(5)]}
+    return SimpleNamespace(status_code=200, json=lambda: payload)
+
+
+class Command(BaseCommand):
+    help = (
+        "Micro-benchmarks the analyzer and view hot paths with Gemini and Google Maps "
+        "stubbed out, appends the results to a history file and fails when a path "
+        "is slower than the stored baseline by more than the threshold (or when "
+        "there is no baseline to compare against)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=5, help="Timing rounds per benchmark (the median is reported)")
+        parser.add_argument("--min-time", type=float, default=0.2, help="Minimum seconds each round runs for")
+        parser.add_argument("--only", nargs="*", help="Run only these benchmarks")
+        parser.add_argument("--baseline", default=str(BENCHMARK_DIR / "baseline.json"), help="Baseline file to compare against")
+        parser.add_argument("--output", default=str(BENCHMARK_DIR / "results.jsonl"), help="File results are appended to")
+        parser.add_argument("--threshold", type=float, default=1.25, help="Allowed slowdown ratio against the baseline")
+        parser.add_argument("--save-baseline", action="store_true", help="Store this run as the new baseline")
+
+    def handle(self, *args, **options):
+        baseline_path = Path(options["baseline"])
+        if not baseline_path.exists() and not options["save_baseline"]:
+            # Without a baseline the regression gate would silently pass
+            raise CommandError(f"No baseline at {baseline_path}. Run with --save-baseline first, or pass --baseline.")
+
+        benchmarks = self.get_benchmarks()
+        if options["only"]:
+            unknown = set(options["only"]) - set(benchmarks)
+            if unknown:
+                raise CommandError(f"Unknown benchmarks: {', '.join(sorted(unknown))}. Valid options are: {', '.join(benchmarks)}.")
+            benchmarks = {name: benchmarks[name] for name in options["only"]}
+
+        results = {}
+        # The dummy cache keeps the Gemini/Places cache from turning every round into a hit
+        with mock.patch.object(analyzer_module.genai, "GenerativeModel", FakeGenerativeModel), \
+                mock.patch.object(views.genai, "GenerativeModel", FakeGenerativeModel), \
+                mock.patch.object(views.requests, "get", fake_maps_get), \
+                override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}}):
+            for name, func in benchmarks.items():
+                results[name] = self.time_benchmark(func, options["repeat"], options["min_time"])
+
+        self.store_results(results, Path(options["output"]))
+
+        baseline = json.loads(baseline_path.read_text()) if baseline_path.exists() else {}
+        regressions = []
+
+        for name, result in results.items():
+            line = f"{name:<40} {result['median_us']:>12.1f} us/call  (min {result['min_us']:.1f})"
+            reference = baseline.get(name)
+            if reference:
+                ratio = result["median_us"] / reference["median_us"]
+                line += f"  {ratio:5.2f}x baseline"
+                if ratio > options["threshold"]:
+                    regressions.append(f"{name} is {ratio:.2f}x slower than baseline")
+                    line = self.style.ERROR(line)
+            elif not options["save_baseline"]:
+                line = self.style.WARNING(line + "  (not in baseline)")
+            self.stdout.write(line)
+
+        if options["save_baseline"]:
+            baseline.update(results)
+            baseline_path.parent.mkdir(parents=True, exist_ok=True)
+            baseline_path.write_text(json.dumps(baseline, indent=2))
+            self.stdout.write(self.style.SUCCESS(f"Baseline saved to {baseline_path}"))
+        elif regressions:
+            raise CommandError("Performance regressions:\n" + "\n".join(regressions))
+
+    def get_benchmarks(self):
+        analyzer = ManufacturingLocationAnalyzer()
+        client = Client()
+        factory = APIRequestFactory()
+        process_info_view = views.ProcessInfoView.as_view()
+        rankings = analyzer.analyze_location("textile", "medium", "Gujarat", raw=True)
+        district_analyzer = ManufacturingLocationAnalyzer(district_data=synthetic_districts(analyzer))
+
+        def process_info():
+            request = factory.post("/process-info/", {"process_name": "cotton t-shirt", "location": "Surat"}, format="json")
+            return process_info_view(request)
+
+        return {
+            "analyzer_init": ManufacturingLocationAnalyzer,
+            "calculate_overall_score": lambda: analyzer.calculate_overall_score("textile", "medium", "Gujarat"),
+            "analyze_location": lambda: analyzer.analyze_location("textile", "medium", "Gujarat"),
+            "analyze_location_profile": lambda: analyzer.analyze_location("textile", "medium", "Gujarat",
+                                                                          weights=[0.1, 0.5, 0.1, 0.3], proximity_weight=0.3),
+            "get_industrial_zone_recommendations": lambda: analyzer.get_industrial_zone_recommendations("Gujarat", "textile"),
+            "rank_districts": lambda: district_analyzer.rank_districts("textile", "medium", "Gujarat"),
+            "format_rankings": lambda: analyzer_module.format_rankings(rankings),
+            "analyze_view": lambda: client.get("/analyze/", {"industry": "textile", "investment": "medium", "state": "Gujarat"}),
+            "analyze_view_compact": lambda: client.get("/analyze/", {"industry": "textile", "investment": "medium", "state": "Gujarat", "format": "compact"}),
+            "process_info_view": process_info,
+        }
+
+    def time_benchmark(self, func, repeat, min_time):
+        func()  # Warm up caches and lazy imports
+
+        # Calibrate how many calls make one round last at least min_time
+        number = 1
+        while True:
+            started = time.perf_counter()
+            for _ in range(number):
+                func()
+            elapsed = time.perf_counter() - started
+            if elapsed >= min_time:
+                break
+            number *= 2 if elapsed < min_time / 4 else 1 + int(min_time / max(elapsed, 1e-9))
+
+        per_call = [elapsed / number]
+        for _ in range(repeat - 1):
+            started = time.perf_counter()
+            for _ in range(number):
+                func()
+            per_call.append((time.perf_counter() - started) / number)
+
+        return {
+            "median_us": round(statistics.median(per_call) * 1e6, 2),
+            "min_us": round(min(per_call) * 1e6, 2),
+            "calls": number * repeat,
+        }
+
+    def store_results(self, results, output_path):
+        try:
+            revision = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                      text=True, cwd=settings.BASE_DIR).stdout.strip()
+        except OSError:
+            revision = ""
+
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        with output_path.open("a") as f:
+            f.write(json.dumps({
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "revision": revision,
+                "results": results,
+            }) + "\n")
@@ -0,0 +1,240 @@
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+DEFAULT_PAYLOADS = {
+    "raw_materials": ["Cotton fiber", "Polyester yarn", "Reactive dyes", "Sewing thread", "Buttons"],
+    "details": {
+        "State/UT": "Gujarat",
+        "Overall Score": 88,
+        "Electricity Tariff": "7.52 INR/unit",
+        "Fixed Charges": "Rs. 0/month",
+        "EODB Score": 99,
+        "Labor Score": 61,
+        "Infrastructure Score": 80,
+        "Recommended Zones": ["Surat", "Ahmedabad", "Vapi"],
+        "Preferred State": {"State/UT": "Gujarat", "Recommended Zones": ["Surat", "Vapi"], "Market": "Strong"},
+        "Conclusion": "Canned response from the fake Gemini server."
+    },
+    "textsearch": {
+        "status": "OK",
+        "results": [
+            {"name": f"Fake Supplier {i}", "rating": round(3.5 + i / 4, 1), "place_id": f"fake-{i}",
+             "geometry": {"location": {"lat": 21.17 + i / 100, "lng": 72.83 + i / 100}}}
+            for i in range(5)
+        ]
+    },
+    "geocode": {
+        "status": "OK",
+        "results": [{
+            "address_components": [
+                {"long_name": "Surat", "types": ["locality", "political"]},
+                {"long_name": "Gujarat", "types": ["administrative_area_level_1", "political"]},
+                {"long_name": "India", "types": ["country", "political"]}
+            ],
+            "geometry": {"location": {"lat": 21.17, "lng": 72.83}}
+        }]
+    }
+}
+
+
+def parse_latency(spec):
+    """
+    Parses a latency distribution spec into a sampler returning seconds.
+
+    Specs are "<distribution>:<params>" in milliseconds: "fixed:50",
+    "uniform:20,80", "normal:120,30", "lognormal:<median>,<sigma>" or
+    "exponential:<mean>".
+    """
+    name, _, params = spec.partition(":")
+    try:
+        values = [float(value) for value in params.split(",") if value]
+    except ValueError:
+        raise CommandError(f"Invalid latency spec '{spec}'")
+
+    samplers = {
+        "fixed": (1, lambda ms: ms),
+        "uniform": (2, lambda low, high: random.uniform(low, high)),
+        "normal": (2, lambda mean, sd: random.gauss(mean, sd)),
+        "lognormal": (2, lambda median, sigma: median * random.lognormvariate(0, sigma)),
+        "exponential": (1, lambda mean: random.expovariate(1 / mean) if mean > 0 else 0),
+    }
+    if name not in samplers or len(values) != samplers[name][0]:
+        raise CommandError(f"Invalid latency spec '{spec}'. Use one of: fixed:ms, uniform:low,high, "
+                           "normal:mean,sd, lognormal:median,sigma, exponential:mean")
+
+    sample = samplers[name][1]
+    return lambda: max(sample(*values), 0) / 1000
+
+
+class FakeUpstreamHandler(BaseHTTPRequestHandler):
+    """Serves the Gemini generateContent and Places textsearch/geocode endpoints."""
+
+    protocol_version = "HTTP/1.1"
+    gemini_path = re.compile(r"^/v1beta/models/[^/:]+:(generateContent|streamGenerateContent)$")
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def do_POST(self):
+        path = urlparse(self.path).path
+        match = self.gemini_path.match(path)
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)) or 0)
+        if not match:
+            return self.send_json(404, {"error": {"code": 404, "message": "Not found"}})
+
+        if self.simulate("gemini"):
+            return
+
+        try:
+            request = json.loads(body or b"{}")
+            prompt = " ".join(part.get("text", "") for content in request.get("contents", [])
+                              for part in content.get("parts", []))
+        except ValueError:
+            return self.send_json(400, {"error": {"code": 400, "message": "Invalid JSON payload"}})
+
+        text = self.gemini_text(prompt, request.get("generationConfig", {}))
+        if match.group(1) == "streamGenerateContent":
+            self.send_stream(text)
+        else:
+            self.send_json(200, self.gemini_response(text))
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        if path.endswith("/place/textsearch/json"):
+            payload = self.server.payloads["textsearch"]
+        elif path.endswith("/geocode/json"):
+            payload = self.server.payloads["geocode"]
+        else:
+            return self.send_json(404, {"status": "NOT_FOUND"})
+
+        if self.simulate("maps"):
+            return
+        self.send_json(200, payload)
+
+    def simulate(self, service):
+        """Sleeps for a sampled latency; returns True if an error response was sent."""
+        time.sleep(self.server.latency[service]())
+        with self.server.lock:
+            self.server.counts[service] += 1
+        if random.random() < self.server.error_rates[service]:
+            status = random.choice([429, 500, 503])
+            self.send_json(status, {"error": {"code": status, "message": "Injected failure"}})
+            return True
+        return False
+
+    def gemini_text(self, prompt, generation_config):
+        payloads = self.server.payloads
+        if "PROCESSES:" in prompt:
+            # Batched raw-materials prompt: one entry per "- name" line
+            names = re.findall(r"^- (.+)$", prompt.split("PROCESSES:", 1)[1], re.MULTILINE)
+            return json.dumps([{"process": name, "materials": payloads["raw_materials"]} for name in names])
+        if "RAW MATERIALS" in prompt.upper():
+            return json.dumps(payloads["raw_materials"])
+        if generation_config.get("responseMimeType") == "application/json":
+            return json.dumps(payloads["details"])
+        return "```json\n" + json.dumps(payloads["details"], indent=2) + "\n```"
+
+    def gemini_response(self, text):
+        return {
+            "candidates": [{
+                "content": {"parts": [{"text": text}], "role": "model"},
+                "finishReason": "STOP",
+                "index": 0
+            }],
+            "usageMetadata": {"promptTokenCount": 0, "candidatesTokenCount": len(text) // 4}
+        }
+
+    def send_json(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_stream(self, text, chunk_size=40):
+        """Streams the text as a JSON array of partial responses, like the REST API."""
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        pieces = [text[i:i + chunk_size] for i in range(0, len(text), chunk_size)] or [""]
+        for i, piece in enumerate(pieces):
+            chunk = ("[" if i == 0 else ",\r\n") + json.dumps(self.gemini_response(piece))
+            if i == len(pieces) - 1:
+                chunk += "]"
+            data = chunk.encode()
+            self.wfile.write(f"{len(data):X}\r\n".encode() + data + b"\r\n")
+            self.wfile.flush()
+            time.sleep(self.server.stream_interval)
+        self.wfile.write(b"0\r\n\r\n")
+
+
+class Command(BaseCommand):
+    help = (
+        "Runs local stand-ins for the Gemini generateContent and Google Places "
+        "textsearch/geocode APIs with configurable latency, error rates and payloads. "
+        "Point GEMINI_API_ENDPOINT=http://HOST:PORT and "
+        "GOOGLE_MAPS_API_BASE=http://HOST:PORT/maps/api at it."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--port", type=int, default=8701)
+        parser.add_argument("--gemini-latency", default="lognormal:800,0.4",
+                            help="Latency distribution for Gemini calls (ms), e.g. lognormal:800,0.4")
+        parser.add_argument("--maps-latency", default="lognormal:150,0.3",
+                            help="Latency distribution for Places/geocode calls (ms), e.g. normal:150,40")
+        parser.add_argument("--gemini-error-rate", type=float, default=0.0, help="Share of Gemini calls that fail")
+        parser.add_argument("--maps-error-rate", type=float, default=0.0, help="Share of Maps calls that fail")
+        parser.add_argument("--stream-interval", type=float, default=0.02,
+                            help="Seconds between chunks of a streamed Gemini response")
+        parser.add_argument("--payloads", help="JSON file overriding raw_materials, details, textsearch or geocode")
+        parser.add_argument("--seed", type=int, help="Seed for latency and error sampling")
+        parser.add_argument("--verbose", action="store_true", help="Log every request")
+
+    def handle(self, *args, **options):
+        if options["seed"] is not None:
+            random.seed(options["seed"])
+
+        payloads = dict(DEFAULT_PAYLOADS)
+        if options["payloads"]:
+            with open(options["payloads"]) as f:
+                overrides = json.load(f)
+            unknown = set(overrides) - set(DEFAULT_PAYLOADS)
+            if unknown:
+                raise CommandError(f"Unknown payload keys: {', '.join(sorted(unknown))}")
+            payloads.update(overrides)
+
+        server = ThreadingHTTPServer((options["host"], options["port"]), FakeUpstreamHandler)
+        server.daemon_threads = True
+        server.payloads = payloads
+        server.latency = {"gemini": parse_latency(options["gemini_latency"]),
+                          "maps": parse_latency(options["maps_latency"])}
+        server.error_rates = {"gemini": options["gemini_error_rate"], "maps": options["maps_error_rate"]}
+        server.stream_interval = options["stream_interval"]
+        server.verbose = options["verbose"]
+        server.lock = threading.Lock()
+        server.counts = {"gemini": 0, "maps": 0}
+
+        address = f"http://{options['host']}:{options['port']}"
+        self.stdout.write(f"Fake upstreams listening on {address}\n"
+                          f"  GEMINI_API_ENDPOINT={address}\n"
+                          f"  GOOGLE_MAPS_API_BASE={address}/maps/api")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            self.stdout.write(f"Served {server.counts['gemini']} Gemini and {server.counts['maps']} Maps requests")
@@ -0,0 +1,169 @@
+import itertools
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+import numpy as np
+import requests
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+ANALYZE_QUERIES = [
+    {"industry": "textile", "investment": "small", "state": "Gujarat"},
+    {"industry": "textile", "investment": "medium", "state": "Tamil Nadu"},
+    {"industry": "electronics", "investment": "large", "state": "Karnataka"},
+    {"industry": "automotive", "investment": "medium", "state": "Maharashtra"},
+    {"industry": "food processing", "investment": "small", "state": "Punjab"},
+]
+PROCESS_INFO_QUERIES = [
+    {"process_name": "cotton t-shirt", "location": "Surat"},
+    {"process_name": "denim jeans", "location": "Ahmedabad"},
+    {"process_name": "silk saree", "location": "Varanasi"},
+    {"process_name": "woollen sweater", "location": "Ludhiana"},
+    {"process_name": "polyester fabric", "location": "Bhiwandi"},
+]
+
+
+def make_request(session, base_url, endpoint, query):
+    if endpoint == "analyze":
+        return session.get(f"{base_url}/analyze/", params=query, timeout=60)
+    return session.post(f"{base_url}/process-info/", json=query, timeout=60)
+
+
+class Command(BaseCommand):
+    help = (
+        "Load-tests /analyze/ and /process-info/ and reports throughput and p50/p95/p99 "
+        "latency for every worker and concurrency setting. Run it against a server using "
+        "the fake_upstreams stand-ins so no API quota is used."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--base-url", default="http://127.0.0.1:8000",
+                            help="Server to test (ignored for settings in --workers)")
+        parser.add_argument("--endpoint", nargs="+", choices=["analyze", "process-info"],
+                            default=["analyze", "process-info"])
+        parser.add_argument("--concurrency", default="1,8,32", help="Comma-separated client concurrency levels")
+        parser.add_argument("--requests", type=int, default=200, help="Requests per endpoint and setting")
+        parser.add_argument("--workers", help="Comma-separated gunicorn worker counts; starts a server for each")
+        parser.add_argument("--threads", type=int, default=4, help="gunicorn threads per worker with --workers")
+        parser.add_argument("--port", type=int, default=8765, help="Port for servers started with --workers")
+        parser.add_argument("--json", help="Also write the results to this file")
+
+    def handle(self, *args, **options):
+        try:
+            concurrency_levels = [int(level) for level in options["concurrency"].split(",")]
+            worker_counts = [int(count) for count in options["workers"].split(",")] if options["workers"] else [None]
+        except ValueError:
+            raise CommandError("--concurrency and --workers take comma-separated integers")
+        if options["requests"] < 1 or min(concurrency_levels) < 1:
+            raise CommandError("--requests and --concurrency must be at least 1")
+
+        results = []
+        for workers in worker_counts:
+            server = None
+            base_url = options["base_url"].rstrip("/")
+            if workers is not None:
+                server = self.start_server(workers, options["threads"], options["port"])
+                base_url = f"http://127.0.0.1:{options['port']}"
+            try:
+                for endpoint, concurrency in itertools.product(options["endpoint"], concurrency_levels):
+                    result = self.run_setting(base_url, endpoint, concurrency, options["requests"])
+                    result["workers"] = workers
+                    results.append(result)
+                    self.report(result)
+            finally:
+                if server is not None:
+                    server.terminate()
+                    server.wait(timeout=30)
+
+        if options["json"]:
+            with open(options["json"], "w") as f:
+                json.dump(results, f, indent=2)
+
+    def start_server(self, workers, threads, port):
+        """Starts gunicorn with the current environment (including upstream settings)."""
+        command = [
+            sys.executable, "-m", "gunicorn", "textile_assistant.wsgi:application",
+            "--workers", str(workers), "--threads", str(threads),
+            "--bind", f"127.0.0.1:{port}", "--log-level", "warning",
+        ]
+        server = subprocess.Popen(command, cwd=settings.BASE_DIR, env=os.environ.copy())
+
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            if server.poll() is not None:
+                raise CommandError(f"gunicorn exited with status {server.returncode}")
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=0.5).close()
+                return server
+            except OSError:
+                time.sleep(0.2)
+
+        server.terminate()
+        raise CommandError(f"gunicorn did not start listening on port {port}")
+
+    def run_setting(self, base_url, endpoint, concurrency, total_requests):
+        queries = itertools.cycle(ANALYZE_QUERIES if endpoint == "analyze" else PROCESS_INFO_QUERIES)
+        lock = threading.Lock()
+        remaining = [total_requests]
+        latencies = []
+        statuses = {}
+
+        def worker():
+            session = requests.Session()
+            while True:
+                with lock:
+                    if remaining[0] == 0:
+                        return
+                    remaining[0] -= 1
+                    query = next(queries)
+
+                started = time.perf_counter()
+                try:
+                    status = make_request(session, base_url, endpoint, query).status_code
+                except requests.RequestException:
+                    status = "error"
+                elapsed = time.perf_counter() - started
+
+                with lock:
+                    latencies.append(elapsed)
+                    statuses[status] = statuses.get(status, 0) + 1
+
+        started = time.perf_counter()
+        threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        wall_time = time.perf_counter() - started
+
+        # No latencies means nothing was sent, so there is nothing to summarize
+        percentiles = np.percentile(latencies, [50, 95, 99]) * 1000 if latencies else [None] * 3
+        p50, p95, p99 = (round(value, 1) if value is not None else None for value in percentiles)
+        return {
+            "endpoint": endpoint,
+            "concurrency": concurrency,
+            "requests": total_requests,
+            "errors": sum(count for status, count in statuses.items() if status == "error" or status >= 400),
+            "statuses": {str(status): count for status, count in statuses.items()},
+            "throughput_rps": round(total_requests / wall_time, 2),
+            "p50_ms": p50,
+            "p95_ms": p95,
+            "p99_ms": p99,
+        }
+
+    def report(self, result):
+        workers = result["workers"] if result["workers"] is not None else "-"
+        if result["p50_ms"] is None:
+            latency = "no latencies recorded"
+        else:
+            latency = f"p50={result['p50_ms']:.1f}ms p95={result['p95_ms']:.1f}ms p99={result['p99_ms']:.1f}ms"
+        self.stdout.write(
+            f"workers={workers:<3} {result['endpoint']:<13} c={result['concurrency']:<4} "
+            f"{result['throughput_rps']:>8.2f} req/s  {latency}  errors={result['errors']}"
+        )
@@ -0,0 +1,52 @@
+import json
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        "Shows or changes the request profiling settings used by ProfilingMiddleware. "
+        "Running servers pick up the change within a second, no restart needed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rate", type=float, help="Share of requests to profile, 0 to 1")
+        parser.add_argument("--profiler", choices=["cprofile", "pyinstrument"], help="Profiler to use")
+        parser.add_argument("--tracemalloc", choices=["on", "off"], help="Also record allocation snapshots")
+        parser.add_argument("--reset", action="store_true", help="Remove the control file and fall back to settings")
+
+    def handle(self, *args, **options):
+        control_file = Path(settings.PROFILING_CONTROL_FILE)
+
+        if options["reset"]:
+            control_file.unlink(missing_ok=True)
+            self.stdout.write("Profiling control file removed; using settings defaults")
+            return
+
+        config = {
+            "sample_rate": settings.PROFILING_SAMPLE_RATE,
+            "profiler": settings.PROFILING_PROFILER,
+            "tracemalloc": settings.PROFILING_TRACEMALLOC,
+        }
+        if control_file.exists():
+            config.update(json.loads(control_file.read_text()))
+
+        if options["rate"] is not None:
+            if not 0 <= options["rate"] <= 1:
+                raise CommandError("--rate must be between 0 and 1")
+            config["sample_rate"] = options["rate"]
+        if options["profiler"]:
+            config["profiler"] = options["profiler"]
+        if options["tracemalloc"]:
+            config["tracemalloc"] = options["tracemalloc"] == "on"
+
+        if any(options[name] is not None for name in ("rate", "profiler", "tracemalloc")):
+            control_file.parent.mkdir(parents=True, exist_ok=True)
+            # Write then rename so servers never read a half-written file
+            temp_file = control_file.with_suffix(".tmp")
+            temp_file.write_text(json.dumps(config, indent=2))
+            temp_file.replace(control_file)
+
+        self.stdout.write(json.dumps(config, indent=2))
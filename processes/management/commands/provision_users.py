@@ -0,0 +1,225 @@
+import csv
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.password_validation import validate_password
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.core.validators import validate_email
+from django.db import IntegrityError, transaction
+from django.db.models.functions import Lower
+
+
+User = get_user_model()
+USERNAME_MAX_LENGTH = User._meta.get_field("username").max_length
+EMAIL_MAX_LENGTH = User._meta.get_field("email").max_length
+
+
+def read_rows(path):
+    """Yields one dict per user from a .csv (with a header row) or .jsonl file, streaming."""
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.endswith(".jsonl"):
+            for line_number, line in enumerate(f, 1):
+                if line.strip():
+                    try:
+                        row = json.loads(line)
+                    except ValueError:
+                        yield {"_error": f"line {line_number}: invalid JSON"}
+                        continue
+                    if isinstance(row, dict):
+                        yield row
+                    else:
+                        yield {"_error": f"line {line_number}: expected a JSON object"}
+        else:
+            yield from csv.DictReader(f)
+
+
+def hash_password(row):
+    """
+    Validates and hashes one password; runs in a worker process.
+
+    Returns:
+        tuple: (hashed password or None, list of validation messages)
+    """
+    user = User(username=row["username"], email=row["email"])
+    try:
+        validate_password(row["password"], user=user)
+    except ValidationError as e:
+        return None, list(e.messages)
+    return make_password(row["password"]), []
+
+
+class Command(BaseCommand):
+    help = (
+        "Creates user accounts in bulk from a CSV (username,email,password header) "
+        "or JSONL file. Emails and usernames are checked for duplicates per batch, "
+        "passwords are validated and hashed in a process pool and each batch is "
+        "inserted with bulk_create in its own transaction."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Users file, .csv or .jsonl")
+        parser.add_argument("--batch-size", type=int, default=1000, help="Users validated and inserted per transaction")
+        parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Processes hashing passwords")
+        parser.add_argument("--errors", help="Write rejected rows and reasons to this JSONL file")
+        parser.add_argument("--dry-run", action="store_true", help="Validate and hash but don't insert")
+
+    def handle(self, *args, **options):
+        if not os.path.exists(options["path"]):
+            raise CommandError(f"{options['path']} does not exist")
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be at least 1")
+
+        errors_file = open(options["errors"], "w") if options["errors"] else None
+        # Emails and usernames already taken earlier in this file
+        seen_emails, seen_usernames = set(), set()
+        totals = {"read": 0, "created": 0, "rejected": 0}
+        started = time.perf_counter()
+
+        try:
+            with ProcessPoolExecutor(max_workers=options["workers"], initializer=django.setup) as executor:
+                rows = read_rows(options["path"])
+                while batch := list(itertools.islice(rows, options["batch_size"])):
+                    totals["read"] += len(batch)
+                    valid, rejected = self.check_batch(batch, seen_emails, seen_usernames)
+                    users, invalid_passwords = self.build_users(valid, executor, options["workers"])
+                    rejected += invalid_passwords
+
+                    if users and not options["dry_run"]:
+                        created, conflicts = self.insert(users)
+                        rejected += conflicts
+                    else:
+                        created = len(users)
+                    totals["created"] += created
+                    totals["rejected"] += len(rejected)
+
+                    if errors_file:
+                        for row, reasons in rejected:
+                            errors_file.write(json.dumps({"row": self.redact(row), "errors": reasons}) + "\n")
+                    self.report(totals, time.perf_counter() - started)
+        finally:
+            self.stderr.write("")
+            if errors_file:
+                errors_file.close()
+
+        elapsed = time.perf_counter() - started
+        verb = "Validated" if options["dry_run"] else "Created"
+        self.stdout.write(
+            f"{verb} {totals['created']} of {totals['read']} users ({totals['rejected']} rejected) "
+            f"in {elapsed:.1f}s, {totals['read'] / elapsed if elapsed else 0:.0f} rows/s"
+        )
+
+    def check_batch(self, batch, seen_emails, seen_usernames):
+        """
+        Checks required fields, username and email format (as the registration
+        form does) and uniqueness for a batch with one query each for emails
+        and usernames.
+
+        Returns:
+            tuple: (rows to create, [(row, reasons)] rejected)
+        """
+        valid, rejected = [], []
+        for row in batch:
+            if "_error" in row:
+                rejected.append((row, [row["_error"]]))
+                continue
+            fields = {key: row.get(key) or "" for key in ("username", "email", "password")}
+            not_text = [key for key, value in fields.items() if not isinstance(value, str)]
+            if not_text:
+                rejected.append((row, [f"Not text: {', '.join(not_text)}"]))
+                continue
+            row = {key: value.strip() for key, value in fields.items()}
+            missing = [key for key, value in row.items() if not value]
+            if missing:
+                rejected.append((row, [f"Missing {', '.join(missing)}"]))
+                continue
+
+            reasons = []
+            if len(row["username"]) > USERNAME_MAX_LENGTH:
+                reasons.append(f"Username must be at most {USERNAME_MAX_LENGTH} characters.")
+            else:
+                try:
+                    User.username_validator(row["username"])
+                except ValidationError as e:
+                    reasons.extend(e.messages)
+            try:
+                if len(row["email"]) > EMAIL_MAX_LENGTH:
+                    raise ValidationError("Enter a valid email address.")
+                validate_email(row["email"])
+            except ValidationError:
+                reasons.append("Enter a valid email address.")
+            if reasons:
+                rejected.append((row, reasons))
+                continue
+            valid.append(row)
+
+        # Like the registration form: emails exact, usernames case-insensitive
+        taken_emails = set(User.objects.filter(email__in=[row["email"] for row in valid])
+                           .values_list("email", flat=True))
+        taken_usernames = set(User.objects.annotate(username_lower=Lower("username"))
+                              .filter(username_lower__in=[row["username"].lower() for row in valid])
+                              .values_list("username_lower", flat=True))
+
+        unique = []
+        for row in valid:
+            username = row["username"].lower()
+            if row["email"] in taken_emails or row["email"] in seen_emails:
+                rejected.append((row, ["This email address is already in use."]))
+            elif username in taken_usernames or username in seen_usernames:
+                rejected.append((row, ["A user with that username already exists."]))
+            else:
+                seen_emails.add(row["email"])
+                seen_usernames.add(username)
+                unique.append(row)
+        return unique, rejected
+
+    def build_users(self, rows, executor, workers):
+        users, rejected = [], []
+        chunksize = max(1, len(rows) // (workers * 4))
+        for row, (password, reasons) in zip(rows, executor.map(hash_password, rows, chunksize=chunksize)):
+            if password is None:
+                rejected.append((row, reasons))
+            else:
+                users.append(User(username=row["username"], email=row["email"], password=password))
+        return users, rejected
+
+    def insert(self, users):
+        """
+        Inserts a batch in one transaction. If another process registered one
+        of the users since the batch was checked, falls back to row-by-row inserts
+        so only the conflicting rows are rejected.
+
+        Returns:
+            tuple: (number created, [(row, reasons)] rejected)
+        """
+        try:
+            with transaction.atomic():
+                User.objects.bulk_create(users)
+            return len(users), []
+        except IntegrityError:
+            pass
+
+        created, rejected = 0, []
+        for user in users:
+            try:
+                with transaction.atomic():
+                    user.save()
+                created += 1
+            except IntegrityError as e:
+                rejected.append(({"username": user.username, "email": user.email}, [str(e)]))
+        return created, rejected
+
+    def redact(self, row):
+        return {key: value for key, value in row.items() if key != "password"}
+
+    def report(self, totals, elapsed):
+        rate = totals["read"] / elapsed if elapsed else 0
+        self.stderr.write(f"\r{totals['read']} read, {totals['created']} ok, {totals['rejected']} rejected, "
+                          f"{rate:.0f} rows/s", ending="")
+        self.stderr.flush()
@@ -0,0 +1,153 @@
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count, Max
+from django.utils import timezone
+
+from processes.models import SavedAnalysis
+from processes.ratelimit import RateLimiter
+from processes.test import analysis_key, get_analyzer, locationfinder
+from processes.views import ProcessInfoView
+
+
+ANALYZE_FIELDS = ("industry", "investment", "state")
+PROCESS_INFO_FIELDS = ("process_name", "location", "limit")
+
+
+def query_kind(query):
+    return SavedAnalysis.PROCESS_INFO if "process_name" in query else SavedAnalysis.ANALYZE
+
+
+def query_id(query):
+    """Identifies a query under the current dataset/prompt versions, for the checkpoint file"""
+    fields = PROCESS_INFO_FIELDS if query_kind(query) == SavedAnalysis.PROCESS_INFO else ANALYZE_FIELDS
+    return analysis_key(query_kind(query), *(query.get(field) for field in fields))
+
+
+class Command(BaseCommand):
+    help = (
+        "Pre-populates the shared cache with Gemini narratives for popular /analyze/ "
+        "queries and raw materials and supplier lists for popular /process-info/ "
+        "queries, read from a JSONL query file or from saved analysis history. "
+        "Runs rate-limited with bounded concurrency and resumes from a checkpoint "
+        "file if interrupted."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--queries", help='JSONL file of {"industry", "investment", "state"} and '
+                                              '{"process_name", "location"} objects')
+        parser.add_argument("--from-history", action="store_true", help="Use the most repeated saved analyses")
+        parser.add_argument("--top", type=int, default=50, help="Queries of each kind to take from history")
+        parser.add_argument("--days", type=int, default=30, help="How far back to look in history")
+        parser.add_argument("--concurrency", type=int, default=4, help="Queries warmed at once")
+        parser.add_argument("--rate", type=float, default=1.0, help="Queries started per second (0 for no limit)")
+        parser.add_argument("--checkpoint", default=str(Path(settings.BASE_DIR) / "cache" / "warm_caches.checkpoint"),
+                            help="File recording finished queries, so a rerun skips them")
+        parser.add_argument("--restart", action="store_true", help="Ignore the checkpoint and warm everything")
+        parser.add_argument("--dry-run", action="store_true", help="List the queries without warming them")
+
+    def handle(self, *args, **options):
+        if not options["queries"] and not options["from_history"]:
+            raise CommandError("Pass --queries FILE and/or --from-history")
+
+        queries = []
+        if options["queries"]:
+            queries += self.read_queries(options["queries"])
+        if options["from_history"]:
+            queries += self.popular_queries(options["top"], options["days"])
+        queries = list({query_id(query): query for query in queries}.items())
+
+        checkpoint = Path(options["checkpoint"])
+        done = set()
+        if options["restart"]:
+            checkpoint.unlink(missing_ok=True)
+        elif checkpoint.exists():
+            done = set(checkpoint.read_text().split())
+        pending = [(key, query) for key, query in queries if key not in done]
+        self.stdout.write(f"{len(queries)} queries, {len(queries) - len(pending)} already warm per checkpoint")
+
+        if options["dry_run"]:
+            for _, query in pending:
+                self.stdout.write(json.dumps(query))
+            return
+
+        # Builds the analyzer's ranking tables once and checks the datasets load
+        analyzer = get_analyzer()
+        limiter = RateLimiter(options["rate"], burst=options["concurrency"])
+        checkpoint.parent.mkdir(parents=True, exist_ok=True)
+        checkpoint_lock = threading.Lock()
+        counts = {"warmed": 0, "failed": 0}
+        started = time.perf_counter()
+
+        with checkpoint.open("a") as checkpoint_file, ThreadPoolExecutor(max_workers=options["concurrency"]) as executor:
+            futures = {executor.submit(self.warm, query, analyzer, limiter): (key, query) for key, query in pending}
+            for future in as_completed(futures):
+                key, query = futures[future]
+                try:
+                    warmed = future.result()
+                except Exception as e:
+                    warmed = False
+                    self.stderr.write(f"Error warming {json.dumps(query)}: {e}")
+                if warmed:
+                    counts["warmed"] += 1
+                    with checkpoint_lock:
+                        checkpoint_file.write(key + "\n")
+                        checkpoint_file.flush()
+                else:
+                    counts["failed"] += 1
+                self.stdout.write(f"[{counts['warmed'] + counts['failed']}/{len(pending)}] "
+                                  f"{'ok    ' if warmed else 'failed'} {json.dumps(query)}")
+
+        self.stdout.write(f"Warmed {counts['warmed']} queries ({counts['failed']} failed) "
+                          f"in {time.perf_counter() - started:.1f}s")
+
+    def read_queries(self, path):
+        queries = []
+        with open(path) as f:
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    query = json.loads(line)
+                except ValueError:
+                    raise CommandError(f"{path}:{line_number}: invalid JSON")
+                required = ("process_name", "location") if query_kind(query) == SavedAnalysis.PROCESS_INFO else ("industry", "investment")
+                if not all(query.get(field) for field in required):
+                    raise CommandError(f"{path}:{line_number}: needs {' and '.join(required)}")
+                queries.append(query)
+        return queries
+
+    def popular_queries(self, top, days):
+        """The inputs of the most repeated saved analyses of each kind in the last `days` days"""
+        since = timezone.now() - timedelta(days=days)
+        latest_ids = []
+        for kind, _ in SavedAnalysis.KIND_CHOICES:
+            popular = (SavedAnalysis.objects.filter(kind=kind, created_at__gte=since)
+                       .values("input_hash").annotate(count=Count("id"), latest=Max("id"))
+                       .order_by("-count")[:top])
+            latest_ids += [row["latest"] for row in popular]
+        return list(SavedAnalysis.objects.filter(id__in=latest_ids).values_list("inputs", flat=True))
+
+    def warm(self, query, analyzer, limiter):
+        """Runs one query through the cached code paths; returns True if its results are now cached"""
+        limiter.acquire()
+        if query_kind(query) == SavedAnalysis.PROCESS_INFO:
+            view = ProcessInfoView()
+            materials = list(view._stream_raw_materials(query["process_name"]))
+            if not materials:
+                return False
+            view._search_suppliers(iter(materials), query["location"],
+                                   query.get("limit") or settings.SUPPLIER_TARGET_COUNT)
+            return True
+
+        industry, investment = query["industry"].lower(), query["investment"].lower()
+        if industry not in analyzer.electricity_intensity or investment not in analyzer.investment_scales:
+            raise ValueError("unknown industry or investment scale")
+        result = locationfinder(industry, investment, query.get("state"))
+        return isinstance(result["results"], dict)
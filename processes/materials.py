@@ -0,0 +1,127 @@
+import re
+from functools import lru_cache
+
+
+# Canonical material names and the variants Gemini commonly returns for them.
+# Plurals, word order, "X (Y)" forms and British spellings are handled by
+# material_key(), so only genuinely different wordings need listing here.
+CANONICAL_MATERIALS = {
+    "Cotton fiber": ["Raw cotton", "Cotton lint", "Cotton bales", "Cotton"],
+    "Cotton yarn": ["Spun cotton", "Cotton thread yarn"],
+    "Polyester fiber": ["Polyester staple fiber", "PSF", "Polyester"],
+    "Polyester yarn": ["Polyester filament yarn", "PFY", "Polyester filament"],
+    "Viscose fiber": ["Viscose rayon", "Rayon fiber", "Viscose", "Rayon"],
+    "Nylon yarn": ["Polyamide yarn", "Nylon filament"],
+    "Elastane": ["Spandex", "Lycra", "Elastane fiber"],
+    "Wool": ["Wool fiber", "Raw wool", "Sheep wool", "Woollen yarn", "Wool yarn"],
+    "Silk": ["Raw silk", "Silk yarn", "Silk thread", "Mulberry silk"],
+    "Jute fiber": ["Raw jute", "Jute"],
+    "Linen": ["Flax fiber", "Flax", "Linen yarn"],
+    "Denim fabric": ["Denim", "Denim cloth"],
+    "Grey fabric": ["Greige fabric", "Grey cloth", "Greige cloth", "Unfinished fabric"],
+    "Sewing thread": ["Stitching thread", "Thread"],
+    "Reactive dyes": ["Reactive dyestuff"],
+    "Disperse dyes": ["Disperse dyestuff"],
+    "Dyes": ["Dyestuff", "Textile dyes", "Colorants", "Dyes and pigments"],
+    "Pigments": ["Pigment colors"],
+    "Textile chemicals": ["Finishing chemicals", "Processing chemicals", "Auxiliary chemicals", "Textile auxiliaries"],
+    "Sizing agents": ["Size", "Sizing chemicals", "Starch size"],
+    "Buttons": ["Shirt buttons"],
+    "Zippers": ["Zip fasteners", "Zips"],
+    "Labels": ["Garment labels", "Woven labels", "Care labels"],
+    "Packaging materials": ["Packaging", "Packing materials", "Cartons", "Poly bags"],
+    "Steel": ["Mild steel", "Steel sheets", "Steel sheet", "Steel plates", "MS sheets"],
+    "Stainless steel": ["SS sheets", "Stainless steel sheets"],
+    "Aluminum": ["Aluminum sheets", "Aluminum ingots", "Aluminum alloy"],
+    "Copper": ["Copper wire", "Copper cathodes"],
+    "Plastic granules": ["Plastic resin", "Polymer granules", "Plastic pellets", "Resin"],
+    "Rubber": ["Natural rubber", "Rubber compound"],
+    "Glass": ["Glass sheets"],
+    "Wood": ["Timber", "Lumber", "Hardwood"],
+    "Plywood": ["Ply board"],
+    "Paper pulp": ["Wood pulp", "Pulp"],
+    "Adhesives": ["Glue", "Binders"],
+    "Paint": ["Paints", "Coatings"],
+    "Fasteners": ["Nuts and bolts", "Screws", "Bolts", "Rivets"],
+}
+
+# Words that mark a store or service rather than a material. Like the original
+# keyword check these match anywhere in the name, case-insensitively.
+EXCLUDED_TERMS = ["store", "shop", "dealer", "retailer", "outlet", "market", "service", "repair", "maintenance"]
+EXCLUDED_PATTERN = re.compile("|".join(map(re.escape, EXCLUDED_TERMS)), re.IGNORECASE)
+
+SPELLING_VARIANTS = {
+    "fibre": "fiber", "colour": "color", "aluminium": "aluminum", "sulphur": "sulfur",
+    "sulphate": "sulfate", "woolen": "wool", "woollen": "wool", "greige": "grey", "gray": "grey",
+}
+IGNORED_WORDS = {"raw", "material", "quality", "grade", "high", "good"}
+
+PARENTHESIZED = re.compile(r"^(.*?)\((.*?)\)(.*)$")
+NON_WORD = re.compile(r"[^a-z0-9]+")
+
+
+def stem(word):
+    """Strips simple English plural endings ("yarns" -> "yarn", "dyes" -> "dye")"""
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 4 and word.endswith(("sses", "xes", "ches", "shes")):
+        return word[:-2]
+    if len(word) > 3 and word.endswith("s") and not word.endswith(("ss", "us", "is")):
+        return word[:-1]
+    return word
+
+
+@lru_cache(maxsize=4096)
+def material_key(name):
+    """
+    Reduces a material name to a comparison key, so "Cotton yarn",
+    "cotton yarns" and "Yarn (cotton)" all map to the same key.
+    """
+    name = name.lower()
+    match = PARENTHESIZED.match(name)
+    if match:
+        # "Yarn (cotton)" -> "cotton yarn"
+        name = f"{match.group(2)} {match.group(1)} {match.group(3)}"
+    words = []
+    for word in NON_WORD.split(name):
+        if not word:
+            continue
+        word = SPELLING_VARIANTS.get(word, word)
+        word = stem(word)
+        word = SPELLING_VARIANTS.get(word, word)
+        if word not in IGNORED_WORDS:
+            words.append(word)
+    return " ".join(sorted(words))
+
+
+# key -> canonical name, covering every canonical name and synonym
+CANONICAL_BY_KEY = {
+    material_key(variant): canonical
+    for canonical, synonyms in CANONICAL_MATERIALS.items()
+    for variant in [canonical, *synonyms]
+}
+
+
+def is_manufacturing_material(material):
+    """Check if a material is actually a raw manufacturing material"""
+    return EXCLUDED_PATTERN.search(material) is None
+
+
+def canonical_material(material):
+    """Returns the canonical name for a material, or the cleaned-up name if it isn't in the table"""
+    return CANONICAL_BY_KEY.get(material_key(material)) or " ".join(material.split())
+
+
+def unique_materials(materials):
+    """
+    Yields each distinct material once, under its canonical name. Works on
+    streams, yielding as items arrive. Stores and services are kept; callers
+    skip them with is_manufacturing_material() where it matters.
+    """
+    seen = set()
+    for material in materials:
+        canonical = canonical_material(material)
+        key = material_key(canonical)
+        if key and key not in seen:
+            seen.add(key)
+            yield canonical
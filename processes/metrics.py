@@ -0,0 +1,128 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+from prometheus_client import multiprocess
+
+
+# Latency buckets from sub-millisecond scoring up to slow Gemini calls
+STAGE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+STAGE_SECONDS = Histogram(
+    "textile_stage_duration_seconds",
+    "Time spent in each stage of a request",
+    ["view", "stage"],
+    buckets=STAGE_BUCKETS,
+)
+UPSTREAM_REQUESTS = Counter(
+    "textile_upstream_requests_total",
+    "Calls to upstream APIs by service and HTTP status (or exception name)",
+    ["service", "status"],
+)
+CACHE_LOOKUPS = Counter(
+    "textile_cache_lookups_total",
+    "Cache lookups by cache and result",
+    ["cache", "result"],
+)
+EXECUTOR_QUEUE = Gauge(
+    "textile_executor_queue_length",
+    "Tasks waiting for a thread in each shared executor",
+    ["executor"],
+    multiprocess_mode="livesum",
+)
+EXECUTOR_REJECTED = Counter(
+    "textile_executor_rejected_total",
+    "Requests or tasks turned away because an executor's queue was full",
+    ["executor"],
+)
+
+
+# Per-thread list that stage timings are also appended to while record_stages() is active
+_stage_log = threading.local()
+
+
+@contextmanager
+def record_stages():
+    """
+    Collects (view, stage, seconds) for every stage timed on this thread, e.g. for a profile.
+
+    Work handed to another thread reports here too if that thread runs it under
+    attach_stages(current_stages()), as FairExecutor does for its tasks.
+    """
+    _stage_log.entries = entries = []
+    try:
+        yield entries
+    finally:
+        _stage_log.entries = None
+
+
+def current_stages():
+    """Returns the list record_stages() is filling on this thread, or None."""
+    return getattr(_stage_log, "entries", None)
+
+
+@contextmanager
+def attach_stages(entries):
+    """Sends stage timings on this thread to another thread's record_stages() list (None sends them nowhere)."""
+    previous = getattr(_stage_log, "entries", None)
+    _stage_log.entries = entries
+    try:
+        yield
+    finally:
+        _stage_log.entries = previous
+
+
+@contextmanager
+def time_stage(view, stage):
+    """Records how long the enclosed block takes in the stage latency histogram."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(view, stage, time.perf_counter() - started)
+
+
+def observe_stage(view, stage, seconds):
+    """Records an already measured duration, e.g. time spent queued for a thread."""
+    STAGE_SECONDS.labels(view, stage).observe(seconds)
+    entries = getattr(_stage_log, "entries", None)
+    if entries is not None:
+        entries.append((view, stage, seconds))
+
+
+def record_upstream(service, status):
+    """Counts one upstream call; status is an HTTP code or an exception."""
+    if isinstance(status, BaseException):
+        # google.api_core errors carry the HTTP status as .code
+        code = getattr(status, "code", None)
+        status = int(code) if isinstance(code, int) else type(status).__name__
+    UPSTREAM_REQUESTS.labels(service, str(status)).inc()
+
+
+def record_cache(cache, hit):
+    CACHE_LOOKUPS.labels(cache, "hit" if hit else "miss").inc()
+
+
+def set_queue_length(executor, length):
+    EXECUTOR_QUEUE.labels(executor).set(length)
+
+
+def record_rejected(executor):
+    EXECUTOR_REJECTED.labels(executor).inc()
+
+
+def render_metrics():
+    """
+    Returns (body, content type) in the Prometheus text format.
+
+    Under gunicorn with PROMETHEUS_MULTIPROC_DIR set, every worker writes its
+    samples there and they are aggregated across workers at scrape time.
+    """
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
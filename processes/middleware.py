@@ -0,0 +1,199 @@
+import cProfile
+import hmac
+import json
+import os
+import random
+import re
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+from .metrics import record_stages
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; GZipMiddleware still compresses responses
+    brotli = None
+
+try:
+    import pyinstrument
+except ImportError:  # the statistical profiler is optional; cProfile is always available
+    pyinstrument = None
+
+
+class BrotliMiddleware(MiddlewareMixin):
+    """
+    Compresses responses with brotli for clients that send ``Accept-Encoding: br``.
+
+    List it after ``GZipMiddleware`` in MIDDLEWARE so it sees the response first;
+    gzip then skips anything already encoded. Does nothing if brotli isn't installed.
+    """
+
+    min_length = 200
+    accepts_br = re.compile(r"\bbr\b")
+
+    def process_response(self, request, response):
+        if brotli is None or response.streaming or len(response.content) < self.min_length:
+            return response
+
+        # Don't compress twice
+        if response.has_header("Content-Encoding"):
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+
+        if not self.accepts_br.search(request.headers.get("Accept-Encoding", "")):
+            return response
+
+        compressed_content = brotli.compress(response.content)
+        if len(compressed_content) >= len(response.content):
+            return response
+
+        response.content = compressed_content
+        response.headers["Content-Length"] = str(len(response.content))
+
+        # A strong ETag no longer matches the encoded bytes
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+
+        response.headers["Content-Encoding"] = "br"
+        return response
+
+
+class ProfilingMiddleware:
+    """
+    Profiles a random sample of requests, plus any request whose
+    ``X-Profile-Token`` header matches settings.PROFILING_TOKEN.
+
+    Each profile is written to PROFILING_OUTPUT_DIR as ``<view>-<time>-<pid>``
+    with a ``.prof`` (cProfile) or ``.html`` (pyinstrument) file and a ``.json``
+    summary holding the per-stage timings from processes.metrics and, when
+    enabled, the top tracemalloc allocation sites.
+
+    The sample rate, profiler and tracemalloc switch are read from
+    PROFILING_CONTROL_FILE whenever it changes (see ``manage.py profiling``),
+    so they can be adjusted without a redeploy.
+    """
+
+    control_check_interval = 1.0
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.output_dir = Path(settings.PROFILING_OUTPUT_DIR)
+        self.control_file = Path(settings.PROFILING_CONTROL_FILE)
+        self.config = {
+            "sample_rate": settings.PROFILING_SAMPLE_RATE,
+            "profiler": settings.PROFILING_PROFILER,
+            "tracemalloc": settings.PROFILING_TRACEMALLOC,
+        }
+        self.control_mtime = None
+        self.next_control_check = 0.0
+        # tracemalloc is process-wide, so only one request traces allocations at a time
+        self.tracemalloc_lock = threading.Lock()
+
+    def __call__(self, request):
+        self.reload_config()
+        if not self.should_profile(request):
+            return self.get_response(request)
+        return self.profile(request)
+
+    def reload_config(self):
+        now = time.monotonic()
+        if now < self.next_control_check:
+            return
+        self.next_control_check = now + self.control_check_interval
+
+        try:
+            mtime = self.control_file.stat().st_mtime
+        except OSError:
+            return
+        if mtime == self.control_mtime:
+            return
+
+        try:
+            with self.control_file.open() as f:
+                self.config.update(json.load(f))
+            self.control_mtime = mtime
+        except (OSError, ValueError) as e:
+            print(f"Error reading profiling control file: {e}")
+
+    def should_profile(self, request):
+        token = request.headers.get("X-Profile-Token")
+        if token and settings.PROFILING_TOKEN and hmac.compare_digest(token, settings.PROFILING_TOKEN):
+            return True
+        return random.random() < self.config["sample_rate"]
+
+    def profile(self, request):
+        use_pyinstrument = self.config["profiler"] == "pyinstrument" and pyinstrument is not None
+        trace_allocations = self.config["tracemalloc"] and self.tracemalloc_lock.acquire(blocking=False)
+
+        profiler = pyinstrument.Profiler() if use_pyinstrument else cProfile.Profile()
+        started = time.perf_counter()
+        try:
+            if trace_allocations:
+                tracemalloc.start()
+            with record_stages() as stages:
+                if use_pyinstrument:
+                    profiler.start()
+                else:
+                    profiler.enable()
+                try:
+                    response = self.get_response(request)
+                finally:
+                    if use_pyinstrument:
+                        profiler.stop()
+                    else:
+                        profiler.disable()
+            allocations = self.top_allocations() if trace_allocations else None
+        finally:
+            if trace_allocations:
+                tracemalloc.stop()
+                self.tracemalloc_lock.release()
+
+        self.write_profile(request, response, profiler, use_pyinstrument, stages, allocations,
+                           time.perf_counter() - started)
+        return response
+
+    def top_allocations(self, limit=25):
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+        return [
+            {"location": str(stat.traceback), "size_kb": round(stat.size / 1024, 1), "count": stat.count}
+            for stat in snapshot.statistics("lineno")[:limit]
+        ]
+
+    def write_profile(self, request, response, profiler, use_pyinstrument, stages, allocations, duration):
+        match = getattr(request, "resolver_match", None)
+        view = (match.url_name or match.view_name) if match else "unresolved"
+        name = f"{re.sub(r'[^A-Za-z0-9_.-]', '_', view)}-{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}-{threading.get_ident()}"
+
+        try:
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+            if use_pyinstrument:
+                (self.output_dir / f"{name}.html").write_text(profiler.output_html())
+            else:
+                profiler.dump_stats(self.output_dir / f"{name}.prof")
+
+            summary = {
+                "view": view,
+                "method": request.method,
+                "path": request.path,
+                "status": response.status_code,
+                "duration_ms": round(duration * 1000, 2),
+                "stages": [
+                    {"view": stage_view, "stage": stage, "ms": round(seconds * 1000, 3)}
+                    for stage_view, stage, seconds in stages
+                ],
+                "allocations": allocations,
+            }
+            (self.output_dir / f"{name}.json").write_text(json.dumps(summary, indent=2))
+        except OSError as e:
+            print(f"Error writing profile {name}: {e}")
@@ -0,0 +1,33 @@
+# Generated by Django 5.2 on 2026-10-19 15:15
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('processes', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SavedAnalysis',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('analyze', 'Location analysis'), ('process_info', 'Process info')], max_length=20)),
+                ('input_hash', models.CharField(db_index=True, max_length=64)),
+                ('inputs', models.JSONField()),
+                ('dataset_version', models.CharField(max_length=20)),
+                ('result', models.JSONField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='analyses', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name_plural': 'saved analyses',
+                'ordering': ['-created_at', '-id'],
+                'indexes': [models.Index(fields=['user', '-created_at'], name='analysis_user_created_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2 on 2026-10-19 15:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('processes', '0002_saved_analysis'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='supplier',
+            name='city',
+            field=models.CharField(db_index=True, max_length=255),
+        ),
+        migrations.AlterField(
+            model_name='supplier',
+            name='material',
+            field=models.CharField(db_index=True, max_length=255),
+        ),
+        migrations.AlterField(
+            model_name='supplier',
+            name='state',
+            field=models.CharField(db_index=True, max_length=255),
+        ),
+    ]
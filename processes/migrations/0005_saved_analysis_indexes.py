@@ -0,0 +1,25 @@
+# Generated by Django 5.2 on 2026-10-19 15:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('processes', '0004_scoring_profile'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='savedanalysis',
+            name='analysis_user_created_idx',
+        ),
+        migrations.AddIndex(
+            model_name='savedanalysis',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='analysis_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='savedanalysis',
+            index=models.Index(fields=['user', 'kind', 'input_hash'], name='analysis_user_kind_hash_idx'),
+        ),
+    ]
@@ -1,13 +1,18 @@
+import math
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
 from django.contrib.auth.models import AbstractUser
 # Create your models here.
 class Supplier(models.Model):
     name = models.CharField(max_length=255)
-    material=models.CharField(max_length=255)
+    material=models.CharField(max_length=255, db_index=True)
     process=models.CharField(max_length=255)
     address=models.TextField()
-    city=models.CharField(max_length=255)
-    state=models.CharField(max_length=255)
+    city=models.CharField(max_length=255, db_index=True)
+    state=models.CharField(max_length=255, db_index=True)
     latitude=models.FloatField()
     longitude=models.FloatField()
     contact=models.CharField(max_length=255,blank=True,null=True)
@@ -30,4 +35,107 @@ class CustomUser(AbstractUser):
     REQUIRED_FIELDS = ['username']  # Username is still required by AbstractUser
     
     def __str__(self):
-        return self.email
\ No newline at end of file
+        return self.email
+
+
+class SavedAnalysis(models.Model):
+    """A user's /analyze/ or /process-info/ result, reused for repeat queries"""
+    ANALYZE = "analyze"
+    PROCESS_INFO = "process_info"
+    KIND_CHOICES = [(ANALYZE, "Location analysis"), (PROCESS_INFO, "Process info")]
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="analyses")
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    # analysis_key() of the normalized inputs, which includes the dataset and prompt versions
+    input_hash = models.CharField(max_length=64, db_index=True)
+    inputs = models.JSONField()
+    dataset_version = models.CharField(max_length=20)
+    result = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-created_at", "-id"]
+        indexes = [
+            # The history list pages on (-created_at, -id)
+            models.Index(fields=["user", "-created_at", "-id"], name="analysis_user_created_idx"),
+            # The repeat-query lookup in _find_saved_analysis
+            models.Index(fields=["user", "kind", "input_hash"], name="analysis_user_kind_hash_idx"),
+        ]
+        verbose_name_plural = "saved analyses"
+
+    def __str__(self):
+        return f"{self.user} - {self.kind} - {self.created_at:%Y-%m-%d %H:%M}"
+
+
+class ScoringProfile(models.Model):
+    """
+    A user's own trade-off between the scoring factors, used by /analyze/?profile=
+    in place of the investment scale's weights. The weights are validated and
+    compiled to weight_vector on save, so ranking with a profile is one matrix
+    product like the built-in scales.
+    """
+    # Same order as ManufacturingLocationAnalyzer.FACTORS
+    FACTORS = ["electricity", "labor", "ease_of_business", "infrastructure"]
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="scoring_profiles")
+    name = models.CharField(max_length=100)
+    # Factor -> non-negative weight, as entered; factors left out weigh 0
+    weights = models.JSONField()
+    # None keeps the analyzer's default bonus for states near the preferred one
+    proximity_weight = models.FloatField(null=True, blank=True,
+                                         validators=[MinValueValidator(0.0), MaxValueValidator(1.0)])
+    # weights in FACTORS order, scaled to sum to 1
+    weight_vector = models.JSONField(editable=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["name", "id"]
+        constraints = [models.UniqueConstraint(fields=["user", "name"], name="scoring_profile_user_name")]
+
+    def __str__(self):
+        return f"{self.user} - {self.name}"
+
+    @classmethod
+    def compile_weights(cls, weights):
+        """
+        Validates factor weights and lays them out as a vector in FACTORS order
+        summing to 1, so {"labor": 2, "infrastructure": 2} and {"labor": 1,
+        "infrastructure": 1} compile (and cache) the same.
+
+        Raises:
+            ValidationError: If weights isn't a mapping of known factors to
+                non-negative numbers with a positive total.
+        """
+        if not isinstance(weights, dict):
+            raise ValidationError("Weights must be an object mapping factors to numbers.")
+        unknown = sorted(set(weights) - set(cls.FACTORS))
+        if unknown:
+            raise ValidationError(f"Unknown factors: {', '.join(unknown)}. Valid options are: {', '.join(cls.FACTORS)}.")
+
+        vector = []
+        for factor in cls.FACTORS:
+            weight = weights.get(factor, 0)
+            if isinstance(weight, bool) or not isinstance(weight, (int, float)) or not math.isfinite(weight) or weight < 0:
+                raise ValidationError(f"The weight for '{factor}' must be a non-negative number.")
+            vector.append(float(weight))
+
+        total = sum(vector)
+        if total <= 0:
+            raise ValidationError("At least one weight must be greater than 0.")
+        return [round(weight / total, 6) for weight in vector]
+
+    def clean(self):
+        try:
+            self.compile_weights(self.weights)
+        except ValidationError as e:
+            raise ValidationError({"weights": e.messages})
+
+    def save(self, *args, **kwargs):
+        self.weight_vector = self.compile_weights(self.weights)
+        super().save(*args, **kwargs)
+
+    @property
+    def analysis_inputs(self):
+        """What an analysis with this profile depends on, for analysis_key()"""
+        return [*self.weight_vector, self.proximity_weight]
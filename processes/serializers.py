@@ -1,5 +1,40 @@
+from django.core.exceptions import ValidationError
 from rest_framework import serializers
+from .models import SavedAnalysis, ScoringProfile
 
 class ProcessRequestSerializer(serializers.Serializer):
     process_name= serializers.CharField(max_length=100)
-    location= serializers.CharField()
\ No newline at end of file
+    location= serializers.CharField()
+    limit = serializers.IntegerField(min_value=1, max_value=20, required=False)
+
+class SavedAnalysisSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = SavedAnalysis
+        fields = ["id", "kind", "inputs", "dataset_version", "created_at"]
+
+
+class SavedAnalysisDetailSerializer(SavedAnalysisSerializer):
+    class Meta(SavedAnalysisSerializer.Meta):
+        fields = SavedAnalysisSerializer.Meta.fields + ["result"]
+
+
+class ScoringProfileSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ScoringProfile
+        fields = ["id", "name", "weights", "proximity_weight", "weight_vector", "created_at", "updated_at"]
+        read_only_fields = ["weight_vector", "created_at", "updated_at"]
+
+    def validate_name(self, value):
+        profiles = ScoringProfile.objects.filter(user=self.context["request"].user, name=value)
+        if self.instance is not None:
+            profiles = profiles.exclude(pk=self.instance.pk)
+        if profiles.exists():
+            raise serializers.ValidationError("You already have a profile with this name.")
+        return value
+
+    def validate_weights(self, value):
+        try:
+            ScoringProfile.compile_weights(value)
+        except ValidationError as e:
+            raise serializers.ValidationError(e.messages)
+        return value
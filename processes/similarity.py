@@ -0,0 +1,154 @@
+import re
+import threading
+from collections import Counter
+
+import numpy as np
+
+from .materials import stem
+
+
+NON_WORD = re.compile(r"[^a-z0-9]+")
+
+
+def similarity_words(text):
+    """
+    Splits text into comparable words: lowercased, hyphens dropped, plurals
+    stemmed and single letters joined to the next word, so "Cotton T Shirts",
+    "cotton t-shirt" and "tshirt (cotton)" all give ["cotton", "tshirt"].
+    """
+    words, prefix = [], ""
+    for word in NON_WORD.split(text.lower().replace("-", "")):
+        if not word:
+            continue
+        if len(word) == 1 and not word.isdigit():
+            prefix += word
+            continue
+        words.append(stem(prefix + word))
+        prefix = ""
+    if prefix:
+        words.append(prefix)
+    return sorted(words)
+
+
+class SimilarityIndex:
+    """
+    In-memory index of texts by character n-gram cosine similarity, mapping
+    each text to a value (e.g. a process name to its raw materials).
+
+    Every text becomes an L2-normalized vector of the n-grams of its words;
+    an inverted index from n-gram to (entry, weight) postings lets lookup()
+    score every entry sharing an n-gram with the query in one np.bincount,
+    which stays well under a millisecond at tens of thousands of entries.
+
+    Args:
+        n (int): N-gram length
+        max_entries (int): Entries kept; adds beyond this are ignored
+        loader (callable, optional): Returns (text, value) pairs to seed the
+            index with, newest first; called on first use
+    """
+
+    def __init__(self, n=3, max_entries=50000, loader=None):
+        self.n = n
+        self.max_entries = max_entries
+        self.loader = loader
+        self.lock = threading.Lock()
+        self.texts = []       # normalized text per entry
+        self.values = []
+        self.entry_ids = {}   # normalized text -> entry id
+        self.gram_ids = {}    # n-gram -> gram id
+        self.postings = []    # gram id -> ([entry ids], [weights])
+        self.arrays = {}      # gram id -> (entry ids, weights) as arrays, rebuilt after adds
+
+    def __len__(self):
+        return len(self.values)
+
+    def vector(self, text):
+        """Returns (normalized text, {n-gram: weight}) with the weights L2-normalized."""
+        words = similarity_words(text)
+        grams = Counter()
+        for word in words:
+            padded = f" {word} "
+            for i in range(max(1, len(padded) - self.n + 1)):
+                grams[padded[i:i + self.n]] += 1
+        norm = np.sqrt(sum(count * count for count in grams.values())) or 1.0
+        return " ".join(words), {gram: count / norm for gram, count in grams.items()}
+
+    def add(self, text, value):
+        """Adds text, or replaces the value of an entry with the same normalized text."""
+        key, vector = self.vector(text)
+        with self.lock:
+            self.load()
+            self.insert(key, vector, value, replace=True)
+
+    def lookup(self, text, threshold):
+        """
+        Finds the entry most similar to text.
+
+        Returns:
+            tuple: (normalized text of the match, value, cosine similarity), or
+                None if nothing scores at least threshold.
+        """
+        key, vector = self.vector(text)
+        with self.lock:
+            self.load()
+            entry = self.entry_ids.get(key)
+            if entry is not None:
+                return key, self.values[entry], 1.0
+
+            entries, weights = [], []
+            for gram, weight in vector.items():
+                gram_id = self.gram_ids.get(gram)
+                if gram_id is None:
+                    continue
+                arrays = self.arrays.get(gram_id)
+                if arrays is None:
+                    ids, gram_weights = self.postings[gram_id]
+                    arrays = self.arrays[gram_id] = (np.array(ids), np.array(gram_weights))
+                entries.append(arrays[0])
+                weights.append(arrays[1] * weight)
+            if not entries:
+                return None
+
+            scores = np.bincount(np.concatenate(entries), np.concatenate(weights), minlength=len(self.values))
+            best = int(scores.argmax())
+            if scores[best] < threshold:
+                return None
+            return self.texts[best], self.values[best], float(scores[best])
+
+    def ensure_loaded(self):
+        """Seeds the index now rather than on the first add or lookup."""
+        with self.lock:
+            self.load()
+
+    def load(self):
+        """Seeds the index from the loader on first use; call with the lock held."""
+        loader, self.loader = self.loader, None
+        if loader is None:
+            return
+        try:
+            for text, value in loader():
+                key, vector = self.vector(text)
+                self.insert(key, vector, value, replace=False)
+        except Exception as e:
+            print(f"Error seeding similarity index: {e}")
+
+    def insert(self, key, vector, value, replace):
+        entry = self.entry_ids.get(key)
+        if entry is not None:
+            if replace:
+                self.values[entry] = value
+            return
+        if len(self.values) >= self.max_entries or not vector:
+            return
+
+        entry = self.entry_ids[key] = len(self.values)
+        self.texts.append(key)
+        self.values.append(value)
+        for gram, weight in vector.items():
+            gram_id = self.gram_ids.setdefault(gram, len(self.gram_ids))
+            if gram_id == len(self.postings):
+                self.postings.append(([], []))
+            ids, weights = self.postings[gram_id]
+            ids.append(entry)
+            weights.append(weight)
+            self.arrays.pop(gram_id, None)
@@ -0,0 +1,120 @@
+import difflib
+import re
+from functools import lru_cache
+
+
+# Canonical state/UT names; a state's id is its position here, which is also
+# its row in the analyzer's factor table and distance matrices
+STATE_NAMES = [
+    "Andaman and Nicobar Islands", "Andhra Pradesh", "Arunachal Pradesh", "Assam", "Bihar",
+    "Chandigarh", "Chhattisgarh", "Dadra and Nagar Haveli", "Delhi", "Goa",
+    "Gujarat", "Haryana", "Himachal Pradesh", "Jammu and Kashmir", "Jharkhand",
+    "Karnataka", "Kerala", "Ladakh", "Lakshadweep", "Madhya Pradesh",
+    "Maharashtra", "Manipur", "Meghalaya", "Mizoram", "Nagaland",
+    "Odisha", "Puducherry", "Punjab", "Rajasthan", "Sikkim",
+    "Tamil Nadu", "Telangana", "Tripura", "Uttar Pradesh", "Uttarakhand",
+    "West Bengal",
+]
+
+# Other names and abbreviations (vehicle and ISO 3166-2:IN codes) for each
+# state. Spacing, case, punctuation and "&" vs "and" are handled by state_key(),
+# so only genuinely different spellings need listing here.
+STATE_ALIASES = {
+    "Andaman and Nicobar Islands": ["AN", "Andaman", "Andaman Nicobar", "Andaman and Nicobar"],
+    "Andhra Pradesh": ["AP"],
+    "Arunachal Pradesh": ["AR"],
+    "Assam": ["AS"],
+    "Bihar": ["BR"],
+    "Chandigarh": ["CH"],
+    "Chhattisgarh": ["CG", "CT", "Chattisgarh"],
+    "Dadra and Nagar Haveli": ["DN", "DH", "DNH", "Dadra", "Daman and Diu", "DD",
+                               "Dadra and Nagar Haveli and Daman and Diu"],
+    "Delhi": ["DL", "New Delhi", "NCT of Delhi", "NCT", "National Capital Territory of Delhi"],
+    "Goa": ["GA"],
+    "Gujarat": ["GJ"],
+    "Haryana": ["HR"],
+    "Himachal Pradesh": ["HP"],
+    "Jammu and Kashmir": ["JK", "J and K", "Kashmir"],
+    "Jharkhand": ["JH"],
+    "Karnataka": ["KA"],
+    "Kerala": ["KL"],
+    "Ladakh": ["LA"],
+    "Lakshadweep": ["LD"],
+    "Madhya Pradesh": ["MP"],
+    "Maharashtra": ["MH"],
+    "Manipur": ["MN"],
+    "Meghalaya": ["ML"],
+    "Mizoram": ["MZ"],
+    "Nagaland": ["NL"],
+    "Odisha": ["OD", "OR", "Orissa"],
+    "Puducherry": ["PY", "Pondicherry"],
+    "Punjab": ["PB"],
+    "Rajasthan": ["RJ"],
+    "Sikkim": ["SK"],
+    "Tamil Nadu": ["TN"],
+    "Telangana": ["TG", "TS"],
+    "Tripura": ["TR"],
+    "Uttar Pradesh": ["UP"],
+    "Uttarakhand": ["UK", "UT", "Uttaranchal"],
+    "West Bengal": ["WB", "Bengal"],
+}
+
+NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+
+def state_key(name):
+    """Reduces a state name to a comparison key: "Jammu & Kashmir" -> "jammuandkashmir", "Tamil-Nadu" -> "tamilnadu"."""
+    return NON_ALNUM.sub("", str(name).lower().replace("&", "and"))
+
+
+class StateResolver:
+    """
+    Maps state names as users and datasets write them to integer state ids.
+
+    Exact names, aliases and abbreviations resolve through one dict lookup
+    on state_key(); anything else falls back to a difflib close match over
+    the known keys (for keys of at least ``min_fuzzy_length`` characters, so
+    "TN" never fuzzily becomes "TR"). Fuzzy results are memoized.
+
+    Args:
+        names (list): Canonical names; ids are positions in this list
+        aliases (dict): Canonical name -> other names for it
+        cutoff (float): Minimum difflib ratio for a fuzzy match
+        min_fuzzy_length (int): Shortest key tried fuzzily
+    """
+
+    def __init__(self, names, aliases, cutoff=0.85, min_fuzzy_length=4):
+        self.names = list(names)
+        self.cutoff = cutoff
+        self.min_fuzzy_length = min_fuzzy_length
+        self.ids = {state_key(name): i for i, name in enumerate(self.names)}
+        for name, others in aliases.items():
+            state_id = self.ids[state_key(name)]
+            for other in others:
+                self.ids.setdefault(state_key(other), state_id)
+        # Only full names are fuzzy-matched; abbreviations are too short to compare
+        self.fuzzy_keys = [key for key in self.ids if len(key) >= min_fuzzy_length]
+        self.fuzzy_match = lru_cache(maxsize=4096)(self._fuzzy_match)
+
+    def resolve(self, name, fuzzy=True):
+        """Returns the state id for a name, alias or (if fuzzy) close misspelling, or None."""
+        if name is None:
+            return None
+        key = state_key(name)
+        state_id = self.ids.get(key)
+        if state_id is None and fuzzy and len(key) >= self.min_fuzzy_length:
+            state_id = self.fuzzy_match(key)
+        return state_id
+
+    def canonical(self, name):
+        """Returns the canonical name for a state, or None if it isn't recognized."""
+        state_id = self.resolve(name)
+        return None if state_id is None else self.names[state_id]
+
+    def _fuzzy_match(self, key):
+        matches = difflib.get_close_matches(key, self.fuzzy_keys, n=1, cutoff=self.cutoff)
+        return self.ids[matches[0]] if matches else None
+
+
+# Built once per process and shared by every analyzer
+state_resolver = StateResolver(STATE_NAMES, STATE_ALIASES)
@@ -1,3 +1,872 @@
-from django.test import TestCase
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+import pandas as pd
+from django.contrib.auth.signals import user_logged_out
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from . import middleware
+from . import test as analyzer_module
+from . import views
+from .authentication import VerifiedTokenCache, token_cache
+from .batching import MicroBatcher
+from .executor import FairExecutor, Saturated
+from .jsonstream import JSONStreamParser, iter_json_items
+from .management.commands import loadtest
+from .management.commands.benchmark import FakeGenerativeModel, fake_maps_get
+from .materials import unique_materials
+from .metrics import record_stages, time_stage
+from .models import CustomUser, SavedAnalysis, ScoringProfile, Supplier
+from .similarity import SimilarityIndex
+from .states import state_resolver
+
+
+LOCMEM_CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+
+def streaming_model(chunks):
+    """A genai.GenerativeModel stand-in whose streamed response is exactly these chunks."""
+    class StreamingModel:
+        def __init__(self, *args, **kwargs):
+            pass
+
+        def generate_content(self, prompt, stream=False, **kwargs):
+            return [SimpleNamespace(text=chunk) for chunk in chunks]
+    return StreamingModel
+
+
+def bearer(user):
+    return {"HTTP_AUTHORIZATION": f"Bearer {RefreshToken.for_user(user).access_token}"}
+
+
+class JSONStreamParserTests(SimpleTestCase):
+    def test_array_split_across_chunks(self):
+        parser = JSONStreamParser()
+        self.assertEqual(parser.feed('```json\n["Cotton", "Pol'), ["Cotton"])
+        self.assertFalse(parser.done)
+        self.assertEqual(parser.feed('yester", {"a": [1, 2]}]\n```'), ["Polyester", {"a": [1, 2]}])
+        self.assertTrue(parser.done)
+        self.assertEqual(parser.feed('["ignored"]'), [])
+
+    def test_object_fields(self):
+        parser = JSONStreamParser()
+        self.assertEqual(parser.feed('Sure! {"State/UT": "Gujarat", "Zones": ["a, b"'), [("State/UT", "Gujarat")])
+        self.assertEqual(parser.feed('], "Score": 80}'), [("Zones", ["a, b"]), ("Score", 80)])
+        self.assertTrue(parser.done)
+
+    def test_truncated_stream_is_not_done(self):
+        parser = JSONStreamParser()
+        self.assertEqual(parser.feed('["Cotton", "Dyes", "Thre'), ["Cotton", "Dyes"])
+        self.assertFalse(parser.done)
+
+    def test_escaped_quotes_and_empty_container(self):
+        parser = JSONStreamParser()
+        self.assertEqual(parser.feed(r'["say \"hi\", ok"]'), ['say "hi", ok'])
+        empty = JSONStreamParser()
+        self.assertEqual(empty.feed("[]"), [])
+        self.assertTrue(empty.done)
+
+    def test_invalid_item_raises(self):
+        with self.assertRaises(ValueError):
+            JSONStreamParser().feed("[Cotton, Dyes]")
+
+    def test_iter_json_items_stops_at_close(self):
+        self.assertEqual(list(iter_json_items(['[1, ', '2]', '[3]'])), [1, 2])
+
+
+class StateResolverTests(SimpleTestCase):
+    def test_names_aliases_and_misspellings(self):
+        for name in ["Tamil Nadu", "tamilnadu", "Tamil-Nadu", "TN"]:
+            self.assertEqual(state_resolver.canonical(name), "Tamil Nadu")
+        self.assertEqual(state_resolver.canonical("J&K"), "Jammu and Kashmir")
+        self.assertEqual(state_resolver.canonical("Orissa"), "Odisha")
+        self.assertEqual(state_resolver.canonical("Gujrat"), "Gujarat")
+
+    def test_unknown_names(self):
+        for name in ["Nowhere", "Mumbai", "Bengaluru", None]:
+            self.assertIsNone(state_resolver.canonical(name))
+        self.assertIsNone(state_resolver.resolve("Gujrat", fuzzy=False))
+
+
+class MaterialsTests(SimpleTestCase):
+    def test_unique_materials_dedupes_and_keeps_stores(self):
+        materials = ["Cotton", "cotton fibre", "Yarn (cotton)", "Cotton yarns", "Fabric store"]
+        self.assertEqual(list(unique_materials(materials)), ["Cotton fiber", "Cotton yarn", "Fabric store"])
+
+    def test_similarity_index_finds_rephrased_names(self):
+        index = SimilarityIndex()
+        index.add("cotton t-shirt", ["Cotton fiber"])
+        match = index.lookup("Cotton T Shirts", 0.9)
+        self.assertEqual(match[1], ["Cotton fiber"])
+        self.assertIsNone(index.lookup("steel almirah", 0.9))
+
+
+class FairExecutorTests(SimpleTestCase):
+    def test_lanes_take_turns(self):
+        executor = FairExecutor(max_workers=1, max_queue=10, name="test")
+        started, release, order = threading.Event(), threading.Event(), []
+
+        def block():
+            started.set()
+            release.wait(5)
+
+        with executor.lane() as first, executor.lane() as second:
+            blocker = first.submit(block)
+            started.wait(5)
+            futures = [first.submit(order.append, "a2"), first.submit(order.append, "a3"),
+                       second.submit(order.append, "b1")]
+            release.set()
+            for future in [blocker, *futures]:
+                future.result(5)
+        self.assertEqual(order, ["a2", "b1", "a3"])
+
+    def test_saturated_queue_raises(self):
+        executor = FairExecutor(max_workers=1, max_queue=0, name="test")
+        with self.assertRaises(Saturated) as raised:
+            with executor.lane():
+                pass
+        self.assertGreaterEqual(raised.exception.retry_after, 1)
+
+    def test_closing_a_lane_cancels_queued_tasks(self):
+        executor = FairExecutor(max_workers=1, max_queue=10, name="test")
+        started, release = threading.Event(), threading.Event()
+        with executor.lane() as blocking:
+            blocking.submit(lambda: (started.set(), release.wait(5)))
+            started.wait(5)
+            with executor.lane() as lane:
+                queued = lane.submit(print, "never")
+            self.assertTrue(queued.cancelled())
+            self.assertTrue(lane.submit(print, "never").cancelled())
+            release.set()
+
+
+class MicroBatcherTests(SimpleTestCase):
+    def test_lone_request_makes_its_own_call(self):
+        batcher = MicroBatcher(lambda keys: [], window=1, max_size=10)
+        with batcher.active():
+            self.assertIsNone(batcher.fetch("a"))
+
+    def test_concurrent_requests_share_one_call(self):
+        calls = []
+
+        def handler(keys):
+            calls.append(sorted(keys))
+            for key in keys:
+                yield key, key.upper()
+
+        batcher = MicroBatcher(handler, window=5, max_size=2)
+        results = {}
+
+        def fetch(key):
+            results[key] = batcher.fetch(key)
+
+        with batcher.active(), batcher.active():
+            threads = [threading.Thread(target=fetch, args=(key,)) for key in "ab"]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join(5)
+        self.assertEqual(results, {"a": "A", "b": "B"})
+        self.assertEqual(calls, [["a", "b"]])
+
+    def test_late_timer_leaves_the_next_batch_alone(self):
+        batcher = MicroBatcher(lambda keys: [], window=60, max_size=10)
+        results = []
+        with batcher.active(), batcher.active():
+            thread = threading.Thread(target=lambda: results.append(batcher.fetch("a")))
+            thread.start()
+            while batcher.pending is None:
+                time.sleep(0.001)
+            batch = batcher.pending
+
+            # The timer of a batch that was already flushed for being full
+            batcher.flush_pending({"b": None})
+            self.assertIs(batcher.pending, batch)
+            self.assertFalse(batch["a"].done())
+
+            batcher.flush_pending(batch)
+            thread.join(5)
+        self.assertIsNone(batcher.pending)
+        self.assertEqual(results, [None])
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class GetDetailsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.analyzer = analyzer_module.get_analyzer()
+        self.rankings = self.analyzer.analyze_location("textile", "medium", raw=True)
+
+    def get_details(self, chunks):
+        with mock.patch.object(analyzer_module.genai, "GenerativeModel", streaming_model(chunks)):
+            return analyzer_module.get_cached_details("textile", "medium", "Kerala", self.analyzer, self.rankings)
+
+    def test_complete_response_is_cached(self):
+        details = self.get_details(['{"State/UT": "Gujarat",', ' "Conclusion": "Viable."}'])
+        self.assertEqual(details, {"State/UT": "Gujarat", "Conclusion": "Viable."})
+        self.assertEqual(self.get_details(["not called"]), details)
+
+    def test_truncated_response_is_text_and_not_cached(self):
+        details = self.get_details(['{"State/UT": "Gujarat",', ' "Conclusion": "Via'])
+        self.assertIsInstance(details, str)
+        self.assertEqual(self.get_details(['{"Conclusion": "Later."}']), {"Conclusion": "Later."})
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class AnalyzeViewTests(TestCase):
+    params = {"industry": "textile", "investment": "medium", "state": "Gujarat"}
+
+    def setUp(self):
+        cache.clear()
+        patcher = mock.patch.object(analyzer_module.genai, "GenerativeModel", FakeGenerativeModel)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.user = CustomUser.objects.create_user(email="a@example.com", username="a", password="pw")
+
+    def test_validation_errors(self):
+        self.assertEqual(self.client.get("/analyze/", {"industry": "textile"}).status_code, 400)
+        self.assertEqual(self.client.get("/analyze/", {**self.params, "industry": "toys"}).status_code, 400)
+        self.assertEqual(self.client.get("/analyze/", {**self.params, "investment": "huge"}).status_code, 400)
+
+    def test_anonymous_response_is_publicly_cacheable(self):
+        response = self.client.get("/analyze/", self.params)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("public", response["Cache-Control"])
+        self.assertNotIn("Cookie", response.get("Vary", ""))
+
+        not_modified = self.client.get("/analyze/", self.params, HTTP_IF_NONE_MATCH=f'W/{response["ETag"]}')
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified["ETag"], response["ETag"])
+
+    def test_truncated_details_are_not_cacheable(self):
+        with mock.patch.object(analyzer_module.genai, "GenerativeModel",
+                               streaming_model(['{"State/UT": "Gujarat",', ' "Conclusion": "Via'])):
+            response = self.client.get("/analyze/", self.params)
+        self.assertEqual(response.status_code, 200)
+        self.assertIsInstance(response.json()["results"], str)
+        self.assertIn("no-store", response["Cache-Control"])
+        self.assertNotIn("ETag", response)
+
+    def test_metrics_count_stages_upstream_calls_and_cache_lookups(self):
+        self.client.get("/analyze/", self.params)
+        response = self.client.get("/metrics")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+        body = response.content.decode()
+        for sample in [
+            'textile_stage_duration_seconds_count{stage="rank_states",view="analyze"}',
+            'textile_upstream_requests_total{service="gemini",status="200"}',
+            'textile_cache_lookups_total{cache="details",result="miss"}',
+        ]:
+            self.assertIn(sample, body)
+
+    def test_state_aliases_share_an_etag(self):
+        tn = self.client.get("/analyze/", {**self.params, "state": "TN"})
+        tamil_nadu = self.client.get("/analyze/", {**self.params, "state": "Tamil Nadu"})
+        self.assertEqual(tn["ETag"], tamil_nadu["ETag"])
+
+    def test_signed_in_queries_are_saved_once(self):
+        for _ in range(2):
+            self.assertEqual(self.client.get("/analyze/", self.params, **bearer(self.user)).status_code, 200)
+        self.assertEqual(SavedAnalysis.objects.filter(user=self.user).count(), 1)
+
+    def test_truncated_details_are_not_saved(self):
+        with mock.patch.object(analyzer_module.genai, "GenerativeModel",
+                               streaming_model(['{"State/UT": "Gujarat",', ' "Conclusion": "Via'])):
+            response = self.client.get("/analyze/", self.params, **bearer(self.user))
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(SavedAnalysis.objects.exists())
+
+    def test_scoring_profile(self):
+        profile = ScoringProfile.objects.create(user=self.user, name="labor", weights={"labor": 1})
+        params = {**self.params, "profile": profile.pk}
+
+        self.assertEqual(self.client.get("/analyze/", params).status_code, 401)
+        other = CustomUser.objects.create_user(email="b@example.com", username="b", password="pw")
+        self.assertEqual(self.client.get("/analyze/", params, **bearer(other)).status_code, 404)
+
+        response = self.client.get("/analyze/", {**params, "format": "compact"}, **bearer(self.user))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("private", response["Cache-Control"])
+        public = self.client.get("/analyze/", {**self.params, "format": "compact"})
+        self.assertNotEqual(response["ETag"], public["ETag"])
+        self.assertNotEqual(response.json()["rankings"], public.json()["rankings"])
+
+        profile.weights = {"infrastructure": 1}
+        profile.save()
+        edited = self.client.get("/analyze/", {**params, "format": "compact"}, **bearer(self.user))
+        self.assertNotEqual(edited["ETag"], response["ETag"])
+
+    def test_zero_proximity_profile_is_not_the_default(self):
+        default = ScoringProfile.objects.create(user=self.user, name="default", weights={"labor": 1})
+        no_proximity = ScoringProfile.objects.create(user=self.user, name="none", weights={"labor": 1},
+                                                     proximity_weight=0.0)
+        responses = [self.client.get("/analyze/", {**self.params, "profile": profile.pk, "format": "compact"},
+                                     **bearer(self.user))
+                     for profile in [default, no_proximity]]
+        self.assertNotEqual(responses[0]["ETag"], responses[1]["ETag"])
+        self.assertEqual(SavedAnalysis.objects.filter(user=self.user).count(), 2)
+
+    @unittest.skipIf(views.msgpack is None, "msgpack is not installed")
+    def test_msgpack_format(self):
+        for kwargs in [{"data": {**self.params, "format": "msgpack"}},
+                       {"data": self.params, "HTTP_ACCEPT": "application/msgpack"}]:
+            with self.subTest(**kwargs):
+                response = self.client.get("/analyze/", **kwargs)
+                self.assertEqual(response["Content-Type"], "application/msgpack")
+                data = views.msgpack.unpackb(response.content, raw=False)
+                self.assertEqual(len(data["rankings"]), 5)
+                self.assertIsInstance(data["rankings"][0]["overall_score"], float)
+
+    @unittest.skipIf(middleware.brotli is None, "brotli is not installed")
+    def test_brotli_response_has_a_weak_etag(self):
+        response = self.client.get("/analyze/", self.params, HTTP_ACCEPT_ENCODING="br")
+        self.assertEqual(response["Content-Encoding"], "br")
+        self.assertTrue(response["ETag"].startswith('W/"'))
+        self.assertIn("results", json.loads(middleware.brotli.decompress(response.content)))
+
+        not_modified = self.client.get("/analyze/", self.params, HTTP_ACCEPT_ENCODING="br",
+                                       HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(not_modified.status_code, 304)
+
+        identity = self.client.get("/analyze/", self.params)
+        self.assertNotIn("Content-Encoding", identity)
+        self.assertEqual(identity["ETag"], response["ETag"][2:])
+
+
+class AnalyzerTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.analyzer = analyzer_module.ManufacturingLocationAnalyzer(proximity_weight=0.5)
+
+    def test_rank_states_matches_calculate_overall_score(self):
+        analyzer = self.analyzer
+        for state in [None, "Gujarat", "Tripura"]:
+            expected = analyzer.calculate_overall_score("metal", "large", state).head(5)
+            weights = analyzer.weight_vector("metal", analyzer.investment_scales["large"]["weights"])
+            top, scores = analyzer.rank_states(weights, state)
+            self.assertEqual(top.tolist(), expected["State_ID"].tolist())
+            np.testing.assert_allclose(scores, expected["Overall_Score_Normalized"].to_numpy())
+
+    def test_custom_weights_change_the_ranking(self):
+        default = self.analyzer.analyze_location("textile", "medium", raw=True)
+        labor_only = self.analyzer.analyze_location("textile", "medium", raw=True, weights=[0, 1, 0, 0])
+        self.assertEqual(len(labor_only), 5)
+        self.assertNotEqual([row["state"] for row in default], [row["state"] for row in labor_only])
+
+    def test_analysis_key_only_treats_none_as_empty(self):
+        key = analyzer_module.analysis_key
+        self.assertEqual(key("Textile ", None), key("textile", ""))
+        self.assertNotEqual(key("textile", 0.0), key("textile", None))
+        self.assertNotEqual(key("textile", 0), key("textile", ""))
+
+    def test_tied_place_credit_splits_ties(self):
+        scores = np.array([[100.0, 100.0, 50.0, 100.0, 20.0]])
+        np.testing.assert_allclose(self.analyzer.tied_place_credit(scores, 1), [[1 / 3, 1 / 3, 0, 1 / 3, 0]])
+        np.testing.assert_allclose(self.analyzer.tied_place_credit(scores, 4), [[1, 1, 1, 1, 0]])
+
+    def test_simulation_probabilities_sum_to_one(self):
+        result = self.analyzer.simulate_rankings("textile", "medium", "Gujarat", scenarios=500, top_k=3, seed=1)
+        states = result["states"]
+        self.assertAlmostEqual(sum(state["probability_first"] for state in states), 1.0, places=2)
+        self.assertAlmostEqual(sum(state["probability_top_k"] for state in states), 3.0, places=2)
+
+    def test_rank_statistics_without_scenarios(self):
+        self.assertEqual(self.analyzer.rank_statistics(np.empty((0, len(self.analyzer.state_names)))), [])
+
+    def test_rank_statistics_shares_ties(self):
+        states = self.analyzer.sensitivity_sweep("textile", "medium", "Gujarat", proximity_weights=[0.5])["states"]
+        capped = [state for state in states if state["mean_score"] == 100]
+        self.assertGreater(len(capped), 1)
+        for state in capped:
+            self.assertAlmostEqual(state["first_place_share"], 1 / len(capped), places=3)
+            self.assertEqual(state["best_rank"], (len(capped) + 1) / 2)
+
+    def test_sensitivity_sweep_rejects_all_zero_weights(self):
+        grid = {factor: [0] for factor in self.analyzer.FACTORS}
+        with self.assertRaises(ValueError):
+            self.analyzer.sensitivity_sweep("textile", weight_grid=grid)
+
+
+class DistrictTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        districts = pd.DataFrame([
+            ("Gujarat", "Surat", 21.17, 72.83, 5.0),
+            ("Gujarat", "Ahmedabad", 23.02, 72.57, None),
+            ("Maharashtra", "Pune", 18.52, 73.86, 6.5),
+            ("Maharashtra", "Nashik", 20.00, 73.78, None),
+            ("Maharashtra", "Aurangabad", 19.88, 75.34, 9.0),
+            ("Bihar", "Aurangabad", 24.75, 84.37, None),
+        ], columns=["State/UT", "District", "Latitude", "Longitude", "Avg_Tariff"])
+        cls.analyzer = analyzer_module.ManufacturingLocationAnalyzer(proximity_weight=0.5, district_data=districts)
+
+    def district(self, index):
+        columns = self.analyzer.district_columns
+        return columns["District"][index], columns["State/UT"][index]
+
+    def test_resolve_district(self):
+        resolve = self.analyzer.resolve_district
+        self.assertEqual(self.district(resolve(" surat ")), ("Surat", "Gujarat"))
+        self.assertEqual(self.district(resolve("Aurangabad, Bihar")), ("Aurangabad", "Bihar"))
+        self.assertEqual(self.district(resolve("aurangabad, MH")), ("Aurangabad", "Maharashtra"))
+        self.assertIsNone(resolve("Aurangabad"))  # ambiguous without the state
+        self.assertIsNone(resolve("Surat, Bihar"))
+        self.assertIsNone(resolve("Nowhere"))
+
+    def test_state_district_distances_are_to_the_nearest_district(self):
+        analyzer = self.analyzer
+        distances = analyzer.state_district_distances
+        gujarat, kerala = analyzer.resolve_state("Gujarat"), analyzer.resolve_state("Kerala")
+        nashik = analyzer.resolve_district("Nashik")
+        self.assertTrue(np.isinf(distances[kerala]).all())
+        self.assertEqual(distances[gujarat][analyzer.resolve_district("Surat")], 0)
+        expected = min(analyzer.haversine_km(*analyzer.district_coords[analyzer.resolve_district(name)],
+                                             *analyzer.district_coords[nashik])
+                       for name in ["Surat", "Ahmedabad"])
+        self.assertAlmostEqual(distances[gujarat][nashik], expected)
+
+    def test_rank_districts(self):
+        analyzer = self.analyzer
+        ranked = analyzer.rank_districts("textile", "medium", state="MH")
+        self.assertEqual({row["state"] for row in ranked}, {"Maharashtra"})
+        self.assertEqual(len(ranked), 3)
+        scores = [row["overall_score"] for row in ranked]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+        self.assertEqual((scores[0], scores[-1]), (100, 0))
+        self.assertEqual(len(analyzer.rank_districts("textile", "medium", top_n=2)), 2)
+
+        plain = {row["district"]: row["overall_score"] for row in analyzer.rank_districts("textile", "medium")}
+        near_surat = {row["district"]: row["overall_score"]
+                      for row in analyzer.rank_districts("textile", "medium", preferred_location="Surat")}
+        self.assertGreaterEqual(near_surat["Surat"], plain["Surat"])
+        self.assertLessEqual(max(near_surat.values()), 100)
+
+    def test_rank_districts_errors(self):
+        with self.assertRaises(ValueError):
+            self.analyzer.rank_districts("textile", "medium", state="Nowhere")
+        with self.assertRaises(ValueError):
+            analyzer_module.get_analyzer().rank_districts("textile", "medium")
+
+
+class SensitivityViewTests(SimpleTestCase):
+    def post(self, body):
+        return self.client.post("/analyze/sensitivity/", json.dumps(body), content_type="application/json")
+
+    def test_invalid_requests(self):
+        zero_grid = {factor: [0] for factor in analyzer_module.ManufacturingLocationAnalyzer.FACTORS}
+        for body in [
+            [],
+            "textile",
+            {"industry": "toys"},
+            {"industry": ["textile"]},
+            {"industry": "textile", "state": ["Gujarat"]},
+            {"industry": "textile", "weights": [1]},
+            {"industry": "textile", "weights": {"labor": 3}},
+            {"industry": "textile", "weights": {"wages": [1]}},
+            {"industry": "textile", "weights": {"labor": [-1]}},
+            {"industry": "textile", "proximity_weights": []},
+            {"industry": "textile", "weights": zero_grid},
+            {"industry": "textile", "samples": 10 ** 9},
+        ]:
+            with self.subTest(body=body):
+                self.assertEqual(self.post(body).status_code, 400)
+
+    def test_grid_sweep(self):
+        response = self.post({"industry": "textile", "weights": {"labor": [0.2, 0.5]}, "proximity_weights": [0, 0.3]})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["scenarios"], 4)
+
+
+class SimulationViewTests(SimpleTestCase):
+    def post(self, body):
+        return self.client.post("/analyze/simulate/", json.dumps(body), content_type="application/json")
+
+    def test_invalid_requests(self):
+        for body in [
+            [],
+            "textile",
+            {"industry": ["textile"]},
+            {"industry": "textile", "investment": 5},
+            {"industry": "textile", "scenarios": 0},
+            {"industry": "textile", "distributions": {"Avg_Tariff": 0.1}},
+            {"industry": "textile", "distributions": {"Rainfall": {"scale": 0.1}}},
+            {"industry": "textile", "distributions": {"Avg_Tariff": {"distribution": "cauchy"}}},
+        ]:
+            with self.subTest(body=body):
+                self.assertEqual(self.post(body).status_code, 400)
+
+    def test_simulation(self):
+        response = self.post({"industry": "textile", "scenarios": 200, "top_k": 3, "seed": 7})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["scenarios"], 200)
+
+
+class LoadtestCommandTests(SimpleTestCase):
+    def test_requests_must_be_positive(self):
+        for options in [{"requests": 0}, {"concurrency": "0"}]:
+            with self.subTest(**options), self.assertRaises(CommandError):
+                call_command("loadtest", **options)
+
+    def test_reports_latency_percentiles(self):
+        response = SimpleNamespace(status_code=200)
+        with mock.patch("processes.management.commands.loadtest.make_request", return_value=response):
+            result = loadtest.Command().run_setting("http://test", "analyze", concurrency=2, total_requests=10)
+        self.assertEqual(result["statuses"], {"200": 10})
+        self.assertIsNotNone(result["p99_ms"])
+
+
+class ProfilingTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.output_dir = Path(directory.name)
+        overrides = override_settings(PROFILING_OUTPUT_DIR=self.output_dir, PROFILING_TOKEN="secret",
+                                      PROFILING_CONTROL_FILE=self.output_dir / "control.json",
+                                      PROFILING_SAMPLE_RATE=0, PROFILING_PROFILER="cprofile")
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+    def profiles(self, suffix):
+        return sorted(self.output_dir.glob(f"analyze-*{suffix}"))
+
+    def test_only_requests_with_the_token_are_profiled(self):
+        self.client.get("/analyze/", {"industry": "textile"})
+        self.client.get("/analyze/", {"industry": "textile"}, HTTP_X_PROFILE_TOKEN="wrong")
+        self.assertEqual(self.profiles(".json"), [])
+
+        self.client.get("/analyze/", {"industry": "textile"}, HTTP_X_PROFILE_TOKEN="secret")
+        [summary] = self.profiles(".json")
+        self.assertEqual(len(self.profiles(".prof")), 1)
+        summary = json.loads(summary.read_text())
+        self.assertEqual((summary["view"], summary["status"]), ("analyze", 400))
+
+    def test_sample_rate_from_the_control_file(self):
+        (self.output_dir / "control.json").write_text(json.dumps({"sample_rate": 1}))
+        self.client.get("/analyze/", {"industry": "textile"})
+        self.assertEqual(len(self.profiles(".json")), 1)
+
+    def test_stages_run_in_executor_threads_are_recorded(self):
+        executor = FairExecutor(max_workers=2, max_queue=10, name="test")
+
+        def lookup():
+            with time_stage("test", "lookup"):
+                pass
+
+        with record_stages() as stages, executor.lane("test") as lane:
+            lane.submit(lookup).result(5)
+        self.assertEqual([stage for _, stage, _ in stages], ["pool_queue", "lookup"])
+
+        # Once the request is done, the worker thread no longer reports to it
+        with executor.lane("test") as lane:
+            lane.submit(lookup).result(5)
+        self.assertEqual(len(stages), 2)
+
+
+@override_settings(CACHES=LOCMEM_CACHES, MATERIAL_SIMILARITY_THRESHOLD=0)
+class ProcessInfoViewTests(TestCase):
+    body = {"process_name": "cotton shirt", "location": "Surat"}
+
+    def setUp(self):
+        cache.clear()
+        patcher = mock.patch("processes.views.requests.get", fake_maps_get)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.user = CustomUser.objects.create_user(email="a@example.com", username="a", password="pw")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def post(self, chunks):
+        with mock.patch.object(views.genai, "GenerativeModel", streaming_model(chunks)):
+            return self.client.post("/process-info/", self.body, format="json")
+
+    def test_invalid_request(self):
+        self.assertEqual(self.client.post("/process-info/", {"location": "Surat"}, format="json").status_code, 400)
+
+    def test_materials_and_suppliers(self):
+        response = self.post(['["Cotton", "Cotton fibre", ', '"Fabric store"]'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["raw_materials"], ["Cotton fiber", "Fabric store"])
+        self.assertEqual({supplier["material"] for supplier in response.data["suppliers"]}, {"Cotton fiber"})
+        self.assertEqual(SavedAnalysis.objects.filter(kind=SavedAnalysis.PROCESS_INFO).count(), 1)
+
+    def test_radius_rings_search_around_the_center(self):
+        view = views.ProcessInfoView()
+        with mock.patch("processes.views.requests.get", side_effect=fake_maps_get) as get:
+            view._get_supplier("Cotton fiber", "Surat")
+            view._get_supplier("Cotton fiber", "Surat", radius=50000, center=(21.17, 72.83))
+            view._get_supplier("Cotton fiber", "Surat", radius=150000, center=(21.17, 72.83))
+        city, *rings = [call.kwargs["params"] for call in get.call_args_list]
+        self.assertEqual(city["query"], "Cotton fiber supplier for manufacturing in Surat")
+        self.assertEqual([ring["radius"] for ring in rings], [50000, 150000])
+        for ring in rings:
+            self.assertEqual(ring["query"], "Cotton fiber supplier for manufacturing")
+            self.assertEqual(ring["location"], "21.17,72.83")
+
+    def test_truncated_materials_are_not_cached_or_saved(self):
+        response = self.post(['["Cotton", "Dyes", "Thre'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["raw_materials"], ["Cotton fiber", "Dyes"])
+        self.assertFalse(SavedAnalysis.objects.exists())
+        self.assertEqual(self.post(['["Wool"]']).data["raw_materials"], ["Wool"])
+
+    def test_busy_executor_returns_503(self):
+        with mock.patch.object(views, "io_executor", FairExecutor(max_workers=1, max_queue=0, name="test")):
+            response = self.post(['["Cotton"]'])
+        self.assertEqual(response.status_code, 503)
+        self.assertIn("Retry-After", response)
+
+
+class SavedAnalysisViewTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(email="a@example.com", username="a", password="pw")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_requires_authentication(self):
+        self.assertEqual(APIClient().get("/analyses/").status_code, 401)
+
+    def test_pages_rows_with_equal_timestamps_once(self):
+        SavedAnalysis.objects.bulk_create([
+            SavedAnalysis(user=self.user, kind=SavedAnalysis.ANALYZE, input_hash=str(i), inputs={},
+                          dataset_version="test", result={"i": i})
+            for i in range(45)
+        ])
+        SavedAnalysis.objects.update(created_at=timezone.now())
+
+        ids, url = [], "/analyses/"
+        while url:
+            page = self.client.get(url).json()
+            self.assertNotIn("result", page["results"][0])
+            ids += [row["id"] for row in page["results"]]
+            url = page["next"]
+        self.assertEqual(sorted(ids), sorted(SavedAnalysis.objects.values_list("id", flat=True)))
+
+    def test_detail_is_limited_to_the_owner(self):
+        other = CustomUser.objects.create_user(email="b@example.com", username="b", password="pw")
+        saved = SavedAnalysis.objects.create(user=other, kind=SavedAnalysis.ANALYZE, input_hash="x",
+                                             inputs={}, dataset_version="test", result={})
+        self.assertEqual(self.client.get(f"/analyses/{saved.pk}/").status_code, 404)
+
+
+class VerifiedTokenCacheTests(TestCase):
+    def setUp(self):
+        token_cache.clear()
+        self.addCleanup(token_cache.clear)
+        self.user = CustomUser.objects.create_user(email="a@example.com", username="a", password="pw")
+
+    def test_entries_expire_and_least_recently_used_are_dropped(self):
+        now = 1000.0
+        users = [SimpleNamespace(pk=i) for i in range(3)]
+        tokens = VerifiedTokenCache(max_size=2, ttl=60)
+        with mock.patch("processes.authentication.time", SimpleNamespace(time=lambda: now)):
+            tokens.put("a", users[0], {"exp": now + 10})
+            tokens.put("b", users[1], {"exp": now + 600})
+            self.assertIsNotNone(tokens.get("a"))
+            tokens.put("c", users[2], {"exp": now + 600})
+            self.assertIsNone(tokens.get("b"))
+
+            now += 30  # past a's exp but within the TTL
+            self.assertIsNone(tokens.get("a"))
+            self.assertIsNotNone(tokens.get("c"))
+            now += 60  # past the TTL
+            self.assertIsNone(tokens.get("c"))
+        self.assertEqual((tokens.entries, tokens.tokens_by_user), ({}, {}))
+
+    def authenticate(self, headers):
+        return self.client.get("/analyses/", **headers).status_code
+
+    def test_saving_deleting_and_logging_out_evict_the_user(self):
+        headers = bearer(self.user)
+        self.assertEqual(self.authenticate(headers), 200)
+        self.assertEqual(len(token_cache.entries), 1)
+
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(token_cache.entries, {})
+        self.assertEqual(self.authenticate(headers), 401)
+
+        self.user.is_active = True
+        self.user.save()
+        self.assertEqual(self.authenticate(headers), 200)
+        user_logged_out.send(sender=CustomUser, request=None, user=self.user)
+        self.assertEqual(token_cache.entries, {})
+
+        self.assertEqual(self.authenticate(headers), 200)
+        self.user.delete()
+        self.assertEqual(token_cache.entries, {})
+        self.assertEqual(self.authenticate(headers), 401)
+
+
+class ScoringProfileTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(email="a@example.com", username="a", password="pw")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_weights_compile_on_save(self):
+        profile = ScoringProfile.objects.create(user=self.user, name="p", weights={"labor": 3, "infrastructure": 1})
+        self.assertEqual(profile.weight_vector, [0.0, 0.75, 0.0, 0.25])
+
+    def test_crud(self):
+        response = self.client.post("/profiles/", {"name": "labor", "weights": {"labor": 2}}, format="json")
+        self.assertEqual(response.status_code, 201)
+        url = f"/profiles/{response.data['id']}/"
+        self.assertEqual(self.client.get("/profiles/").data[0]["weight_vector"], [0.0, 1.0, 0.0, 0.0])
+
+        response = self.client.patch(url, {"weights": {"electricity": 1, "labor": 1}}, format="json")
+        self.assertEqual(response.data["weight_vector"], [0.5, 0.5, 0.0, 0.0])
+        self.assertEqual(self.client.delete(url).status_code, 204)
+        self.assertFalse(ScoringProfile.objects.exists())
+
+    def test_invalid_profiles(self):
+        ScoringProfile.objects.create(user=self.user, name="taken", weights={"labor": 1})
+        for body in [
+            {"name": "taken", "weights": {"labor": 1}},
+            {"name": "p", "weights": [1]},
+            {"name": "p", "weights": {"wages": 1}},
+            {"name": "p", "weights": {"labor": -1}},
+            {"name": "p", "weights": {"labor": True}},
+            {"name": "p", "weights": {"labor": 0}},
+            {"name": "p", "weights": {"labor": 1}, "proximity_weight": 2},
+        ]:
+            with self.subTest(body=body):
+                self.assertEqual(self.client.post("/profiles/", body, format="json").status_code, 400)
+
+    def test_profiles_are_private(self):
+        other = CustomUser.objects.create_user(email="b@example.com", username="b", password="pw")
+        profile = ScoringProfile.objects.create(user=other, name="theirs", weights={"labor": 1})
+        self.assertEqual(self.client.get("/profiles/").data, [])
+        self.assertEqual(self.client.get(f"/profiles/{profile.pk}/").status_code, 404)
+        self.assertEqual(APIClient().get("/profiles/").status_code, 401)
+
+
+class SupplierAdminTests(TestCase):
+    def setUp(self):
+        for state, city, material in [("Tamil Nadu", "Tiruppur", "Cotton yarn"), ("Gujarat", "Surat", "Polyester yarn")]:
+            Supplier.objects.create(name=f"{city} Mills", material=material, process="spinning", address="-",
+                                    city=city, state=state, latitude=0, longitude=0)
+        CustomUser.objects.create_superuser(email="admin@example.com", username="admin", password="pw")
+        self.client.login(email="admin@example.com", password="pw")
+
+    def test_search_matches_whole_terms(self):
+        for term in ["Tamil Nadu", "tamil nadu", "TN", '"Tamil Nadu"', "cotton yarns", "tiruppur"]:
+            with self.subTest(term=term):
+                response = self.client.get("/admin/processes/supplier/", {"q": term})
+                self.assertContains(response, "Tiruppur Mills")
+                self.assertNotContains(response, "Surat Mills")
+
+
+class CommandTests(TestCase):
+    def write_jsonl(self, lines):
+        f = tempfile.NamedTemporaryFile("w", suffix=".jsonl", delete=False)
+        with f:
+            f.write("\n".join(lines) + "\n")
+        self.addCleanup(os.remove, f.name)
+        return f.name
+
+    def test_analyze_batch_reports_bad_lines(self):
+        path = self.write_jsonl([
+            "[1, 2]",
+            json.dumps({"industry": "textile", "investment": "medium", "state": "TN"}),
+            json.dumps({"industry": 5, "investment": "small"}),
+            "not json",
+            json.dumps({"industry": "toys", "investment": "small"}),
+        ])
+        output = path.replace(".jsonl", ".out.jsonl")
+        self.addCleanup(os.remove, output)
+        call_command("analyze_batch", path, output=output, workers=1, stderr=io.StringIO())
+
+        with open(output) as f:
+            results = [json.loads(line) for line in f]
+        self.assertEqual(len(results), 5)
+        self.assertEqual(["error" in result for result in results], [True, False, True, True, True])
+        self.assertEqual(results[1]["query"]["state"], "Tamil Nadu")
+        self.assertEqual(len(results[1]["rankings"]), 5)
+
+    @override_settings(CACHES=LOCMEM_CACHES)
+    def test_warm_caches_resumes_from_its_checkpoint(self):
+        path = self.write_jsonl([
+            json.dumps({"industry": "textile", "investment": "medium", "state": "Gujarat"}),
+            json.dumps({"industry": "metal", "investment": "large"}),
+            json.dumps({"industry": "toys", "investment": "small"}),
+        ])
+        checkpoint = path.replace(".jsonl", ".checkpoint")
+        self.addCleanup(os.remove, checkpoint)
+
+        def warm(**options):
+            stdout = io.StringIO()
+            with mock.patch.object(analyzer_module.genai, "GenerativeModel", FakeGenerativeModel):
+                call_command("warm_caches", queries=path, checkpoint=checkpoint, rate=0, concurrency=1,
+                             stdout=stdout, stderr=io.StringIO(), **options)
+            return stdout.getvalue()
+
+        self.assertIn("Warmed 2 queries (1 failed)", warm())
+        with open(checkpoint) as f:
+            self.assertEqual(len(f.read().split()), 2)
+
+        output = warm()
+        self.assertIn("3 queries, 2 already warm per checkpoint", output)
+        self.assertIn("Warmed 0 queries (1 failed)", output)
+        self.assertIn("Warmed 2 queries (1 failed)", warm(restart=True))
+
+    def test_provision_users_rejects_invalid_rows(self):
+        path = self.write_jsonl([
+            "[1]",
+            json.dumps({"username": "good_user", "email": "good@example.com", "password": "Str0ng-passw0rd!"}),
+            json.dumps({"username": "has space", "email": "space@example.com", "password": "Str0ng-passw0rd!"}),
+            json.dumps({"username": "x" * 151, "email": "long@example.com", "password": "Str0ng-passw0rd!"}),
+            json.dumps({"username": 5, "email": "number@example.com", "password": "Str0ng-passw0rd!"}),
+            json.dumps({"username": "bad_email", "email": "nope", "password": "Str0ng-passw0rd!"}),
+            json.dumps({"username": "GOOD_USER", "email": "other@example.com", "password": "Str0ng-passw0rd!"}),
+        ])
+        errors = path.replace(".jsonl", ".errors.jsonl")
+        self.addCleanup(os.remove, errors)
+        call_command("provision_users", path, workers=1, errors=errors, stdout=io.StringIO(), stderr=io.StringIO())
+
+        self.assertEqual(list(CustomUser.objects.values_list("username", flat=True)), ["good_user"])
+        with open(errors) as f:
+            rejected = [json.loads(line) for line in f]
+        self.assertEqual(len(rejected), 6)
+        self.assertTrue(all("password" not in row["row"] for row in rejected))
+
+
+class BenchmarkCommandTests(SimpleTestCase):
+    def test_missing_baseline_fails(self):
+        with tempfile.TemporaryDirectory() as directory:
+            baseline = os.path.join(directory, "baseline.json")
+            with self.assertRaisesMessage(CommandError, "No baseline"):
+                call_command("benchmark", baseline=baseline, output=os.path.join(directory, "results.jsonl"))
+
+    def test_saved_baseline_gates_later_runs(self):
+        with tempfile.TemporaryDirectory() as directory:
+            options = {
+                "only": ["format_rankings"], "repeat": 1, "min_time": 0.001,
+                "baseline": os.path.join(directory, "baseline.json"),
+                "output": os.path.join(directory, "results.jsonl"),
+                "stdout": io.StringIO(),
+            }
+            call_command("benchmark", save_baseline=True, **options)
+            with open(options["baseline"]) as f:
+                self.assertIn("format_rankings", json.load(f))
+
+            call_command("benchmark", threshold=1000, **options)
+            with self.assertRaisesMessage(CommandError, "Performance regressions"):
+                call_command("benchmark", threshold=0.001, **options)
@@ -1,16 +1,18 @@
 from django.urls import path
-from .views import ProcessInfoView
-
-urlpatterns=[
-    path('process-info/',ProcessInfoView.as_view(),name='process-info')
-]
-from django.urls import path
 from . import views
 
 urlpatterns = [
+    path('process-info/', views.ProcessInfoView.as_view(), name='process-info'),
     path('register/', views.register_view, name='register'),
     path('login/', views.login_view, name='login'),
     path('logout/', views.logout_view, name='logout'),
     path("analyze/", views.analyze_view, name="analyze"),
+    path("analyze/sensitivity/", views.sensitivity_view, name="analyze-sensitivity"),
+    path("analyze/simulate/", views.simulation_view, name="analyze-simulate"),
+    path("metrics", views.metrics_view, name="metrics"),
+    path("analyses/", views.SavedAnalysisListView.as_view(), name="saved-analysis-list"),
+    path("analyses/<int:pk>/", views.SavedAnalysisDetailView.as_view(), name="saved-analysis-detail"),
+    path("profiles/", views.ScoringProfileListView.as_view(), name="scoring-profile-list"),
+    path("profiles/<int:pk>/", views.ScoringProfileDetailView.as_view(), name="scoring-profile-detail"),
 
 ]
\ No newline at end of file
@@ -9,6 +9,7 @@ https://docs.djangoproject.com/en/5.1/topics/settings/
 For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
+import os
 from datetime import timedelta
 from pathlib import Path
 
@@ -28,7 +29,7 @@ DEBUG = True
 ALLOWED_HOSTS = ['*']
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'processes.authentication.CachedJWTAuthentication',
     ],
 }
 SIMPLE_JWT = {
@@ -38,6 +39,74 @@ SIMPLE_JWT = {
     'BLACKLIST_AFTER_ROTATION': True,
 }
 
+# Skip the session login() in login_view and only mint JWTs (the API clients
+# don't use the session cookie)
+AUTH_JWT_ONLY = os.environ.get('AUTH_JWT_ONLY', '') == '1'
+# Verified access tokens are cached per process (see processes/authentication.py);
+# the TTL bounds how long another worker can miss a deactivation or password change
+JWT_VERIFY_CACHE_SIZE = int(os.environ.get('JWT_VERIFY_CACHE_SIZE', '10000'))
+JWT_VERIFY_CACHE_TTL = int(os.environ.get('JWT_VERIFY_CACHE_TTL', '60'))
+
+
+# Upstream APIs. Point these at `python manage.py fake_upstreams` for load tests,
+# e.g. GEMINI_API_ENDPOINT=http://127.0.0.1:8701
+#      GOOGLE_MAPS_API_BASE=http://127.0.0.1:8701/maps/api
+GEMINI_API_ENDPOINT = os.environ.get('GEMINI_API_ENDPOINT')
+GOOGLE_MAPS_API_BASE = os.environ.get('GOOGLE_MAPS_API_BASE', 'https://maps.googleapis.com/maps/api')
+
+# How long browsers and CDNs may reuse an /analyze/ response before revalidating
+# it with If-None-Match (the ETag changes with the inputs and DATASET_VERSION)
+ANALYZE_CACHE_MAX_AGE = int(os.environ.get('ANALYZE_CACHE_MAX_AGE', '3600'))
+
+# CSV of per-district data ("State/UT", "District", "Latitude", "Longitude" and
+# optionally tariffs, labor costs and zone scores) enabling district rankings;
+# unset keeps the analyzer state-level only
+DISTRICT_DATA_PATH = os.environ.get('DISTRICT_DATA_PATH') or None
+
+# /process-info/ requests arriving while others are in flight wait up to this
+# long to share one Gemini raw-materials prompt (0 disables batching)
+GEMINI_BATCH_WINDOW_MS = float(os.environ.get('GEMINI_BATCH_WINDOW_MS', '5'))
+GEMINI_BATCH_MAX_SIZE = int(os.environ.get('GEMINI_BATCH_MAX_SIZE', '16'))
+
+# A /process-info/ process name whose character n-gram cosine similarity to
+# one answered before is at least this reuses that raw material list (0 disables).
+# Each worker indexes up to MATERIAL_INDEX_MAX_ENTRIES names, seeded from history.
+MATERIAL_SIMILARITY_THRESHOLD = float(os.environ.get('MATERIAL_SIMILARITY_THRESHOLD', '0.9'))
+MATERIAL_INDEX_MAX_ENTRIES = int(os.environ.get('MATERIAL_INDEX_MAX_ENTRIES', '50000'))
+
+# /process-info/ searches these rings in order for each material and stops as
+# soon as it has SUPPLIER_TARGET_COUNT suppliers (clients can pass `limit`).
+# "city" searches in the given location, "radius" within that many metres of
+# its geocoded centre, "state" across its whole state.
+SUPPLIER_SEARCH_RINGS = [
+    {"scope": "city"},
+    {"scope": "radius", "radius": 25000},
+    {"scope": "radius", "radius": 100000},
+    {"scope": "state"},
+]
+SUPPLIER_TARGET_COUNT = 3
+
+# Places lookups from all requests in a worker process share this many threads.
+# Past IO_EXECUTOR_MAX_QUEUE waiting lookups /process-info/ answers 503 with
+# Retry-After instead of queueing more.
+IO_EXECUTOR_WORKERS = int(os.environ.get('IO_EXECUTOR_WORKERS', '16'))
+IO_EXECUTOR_MAX_QUEUE = int(os.environ.get('IO_EXECUTOR_MAX_QUEUE', '256'))
+
+# Shared by all workers (and `manage.py warm_caches`): Gemini narratives and raw
+# material lists, and Places results. Set REDIS_URL to use Redis instead of files.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ['REDIS_URL'],
+    } if os.environ.get('REDIS_URL') else {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get('CACHE_DIR', BASE_DIR / 'cache'),
+        'OPTIONS': {'MAX_ENTRIES': 50000},
+    }
+}
+GEMINI_CACHE_TIMEOUT = int(os.environ.get('GEMINI_CACHE_TIMEOUT', 7 * 24 * 3600))
+SUPPLIER_CACHE_TIMEOUT = int(os.environ.get('SUPPLIER_CACHE_TIMEOUT', 24 * 3600))
+
 
 # Application definition
 
@@ -55,14 +124,29 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    # Compression must wrap everything that writes the response body;
+    # brotli runs first on the way out, gzip handles clients without br
+    'django.middleware.gzip.GZipMiddleware',
+    'processes.middleware.BrotliMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'processes.middleware.ProfilingMiddleware',
 ]
 
+# Request profiling (processes.middleware.ProfilingMiddleware). The control file
+# overrides the sample rate, profiler and tracemalloc switch at runtime; write it
+# with `python manage.py profiling`.
+PROFILING_SAMPLE_RATE = float(os.environ.get('PROFILING_SAMPLE_RATE', '0'))
+PROFILING_PROFILER = os.environ.get('PROFILING_PROFILER', 'cprofile')  # or 'pyinstrument'
+PROFILING_TRACEMALLOC = os.environ.get('PROFILING_TRACEMALLOC', '') == '1'
+PROFILING_TOKEN = os.environ.get('PROFILING_TOKEN')  # requests sending X-Profile-Token: <token> are always profiled
+PROFILING_OUTPUT_DIR = os.environ.get('PROFILING_OUTPUT_DIR', BASE_DIR / 'profiles')
+PROFILING_CONTROL_FILE = os.environ.get('PROFILING_CONTROL_FILE', BASE_DIR / 'profiles' / 'control.json')
+
 ROOT_URLCONF = 'textile_assistant.urls'
 
 TEMPLATES = [